@@ -1,12 +1,37 @@
 from __future__ import annotations
 
+import argparse
+import asyncio
+import bisect
 import colorsys
+import contextlib
+import functools
+import hashlib
+import itertools
 import json
 import math
+import mmap
+import multiprocessing
+import os
+import random
 import re
+import struct
+import sys
+import time
 import tkinter as tk
+from array import array
+from collections import OrderedDict
+from collections.abc import Iterable
+from multiprocessing import shared_memory
 from pathlib import Path
-from tkinter import colorchooser, filedialog, messagebox, ttk
+from tkinter import colorchooser, filedialog, messagebox, simpledialog, ttk
+from tkinter import font as tkfont
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 import ttkbootstrap as tb
 
@@ -20,6 +45,270 @@ def _hsv_to_hex(hue: float, saturation: float, value: float) -> str:
     return f"#{int(round(r * 255)):02X}{int(round(g * 255)):02X}{int(round(b * 255)):02X}"
 
 
+def normalize_hex(value: object) -> str | None:
+    """Normalize ``#RGB``/``RRGGBB``-style input to ``#RRGGBB``; return None when invalid."""
+    if not isinstance(value, str):
+        return None
+    hex_value = value.strip().upper()
+    if not hex_value.startswith("#"):
+        hex_value = f"#{hex_value}"
+    if not re.fullmatch(r"#([0-9A-F]{3}|[0-9A-F]{6})", hex_value):
+        return None
+    if len(hex_value) == 4:
+        hex_value = f"#{hex_value[1]*2}{hex_value[2]*2}{hex_value[3]*2}"
+    return hex_value
+
+
+def sanitize_palette(colors: Iterable, limit: int | None = None) -> list[str]:
+    """Normalize, drop invalid entries and de-duplicate while keeping first-seen order.
+
+    With a ``limit`` the input is only consumed until that many colors are collected.
+    """
+    normalized: list[str] = []
+    seen: set[str] = set()
+    for value in colors:
+        if limit is not None and len(normalized) >= limit:
+            break
+        hex_value = normalize_hex(value)
+        if hex_value is not None and hex_value not in seen:
+            seen.add(hex_value)
+            normalized.append(hex_value)
+    return normalized
+
+
+def _hex_to_rgb(hex_value: str) -> tuple[int, int, int]:
+    return (int(hex_value[1:3], 16), int(hex_value[3:5], 16), int(hex_value[5:7], 16))
+
+
+def _rgb_to_hex(rgb: tuple[int, int, int]) -> str:
+    return f"#{rgb[0]:02X}{rgb[1]:02X}{rgb[2]:02X}"
+
+
+# sRGB <-> linear light lookup tables. Decoding is exact for 8-bit input; encoding
+# quantizes linear values into 4096 steps, which is finer than an 8-bit output needs.
+_SRGB_TO_LINEAR = tuple(
+    (i / 255) / 12.92 if i / 255 <= 0.04045 else ((i / 255 + 0.055) / 1.055) ** 2.4 for i in range(256)
+)
+_LINEAR_STEPS = 4096
+_LINEAR_TO_SRGB = bytes(
+    int(round(255 * (12.92 * x if x <= 0.0031308 else 1.055 * x ** (1 / 2.4) - 0.055)))
+    for x in (i / _LINEAR_STEPS for i in range(_LINEAR_STEPS + 1))
+)
+
+
+def _encode_linear(value: float) -> int:
+    index = int(value * _LINEAR_STEPS + 0.5)
+    if index <= 0:
+        return 0
+    if index >= _LINEAR_STEPS:
+        return 255
+    return _LINEAR_TO_SRGB[index]
+
+
+# WCAG 2.x relative-luminance channel table (note the 0.03928 knee from the spec).
+_WCAG_CHANNEL_LUMINANCE = tuple(
+    (i / 255) / 12.92 if i / 255 <= 0.03928 else ((i / 255 + 0.055) / 1.055) ** 2.4 for i in range(256)
+)
+
+
+def relative_luminance(rgb: tuple[int, int, int]) -> float:
+    table = _WCAG_CHANNEL_LUMINANCE
+    return 0.2126 * table[rgb[0]] + 0.7152 * table[rgb[1]] + 0.0722 * table[rgb[2]]
+
+
+def contrast_rating(ratio: float) -> str:
+    if ratio >= 7:
+        return "AAA"
+    if ratio >= 4.5:
+        return "AA"
+    return "Fail"
+
+
+def _luminance_contrast(l1: float, l2: float) -> float:
+    lighter, darker = (l1, l2) if l1 >= l2 else (l2, l1)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+def contrast_ratio(rgb1: tuple[int, int, int], rgb2: tuple[int, int, int]) -> float:
+    return _luminance_contrast(relative_luminance(rgb1), relative_luminance(rgb2))
+
+
+CVD_MODES = ("normal", "protanopia", "deuteranopia", "tritanopia", "achromatopsia")
+
+# Full-severity dichromacy matrices from Machado, Oliveira & Fernandes (2009) and a
+# luminance-only projection for achromatopsia; all operate on linear RGB.
+CVD_MATRICES: dict[str, tuple[tuple[float, float, float], ...]] = {
+    "protanopia": (
+        (0.152286, 1.052583, -0.204868),
+        (0.114503, 0.786281, 0.099216),
+        (-0.003882, -0.048116, 1.051998),
+    ),
+    "deuteranopia": (
+        (0.367322, 0.860646, -0.227968),
+        (0.280085, 0.672501, 0.047413),
+        (-0.011820, 0.042940, 0.968881),
+    ),
+    "tritanopia": (
+        (1.255528, -0.076749, -0.178779),
+        (-0.078411, 0.930809, 0.147602),
+        (0.004733, 0.691367, 0.303900),
+    ),
+    "achromatopsia": (
+        (0.2126, 0.7152, 0.0722),
+        (0.2126, 0.7152, 0.0722),
+        (0.2126, 0.7152, 0.0722),
+    ),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _cvd_tables(mode: str) -> tuple[tuple[tuple[float, ...], ...], ...]:
+    """Fold linearization into the matrix: one 256-entry table per (output, input) channel pair."""
+    matrix = CVD_MATRICES[mode]
+    return tuple(tuple(tuple(row[k] * lin for lin in _SRGB_TO_LINEAR) for k in range(3)) for row in matrix)
+
+
+def simulate_cvd_rgb(rgb: tuple[int, int, int], mode: str) -> tuple[int, int, int]:
+    if mode == "normal":
+        return rgb
+    r, g, b = rgb
+    (rr, rg, rb), (gr, gg, gb), (br, bg, bb) = _cvd_tables(mode)
+    return (
+        _encode_linear(rr[r] + rg[g] + rb[b]),
+        _encode_linear(gr[r] + gg[g] + gb[b]),
+        _encode_linear(br[r] + bg[g] + bb[b]),
+    )
+
+
+@functools.lru_cache(maxsize=8192)
+def simulate_cvd_hex(hex_value: str, mode: str) -> str:
+    if mode == "normal":
+        return hex_value
+    return _rgb_to_hex(simulate_cvd_rgb(_hex_to_rgb(hex_value), mode))
+
+
+def simulate_cvd_palette(colors: list[str], mode: str) -> list[str]:
+    return [simulate_cvd_hex(color, mode) for color in colors]
+
+
+def simulate_cvd_pixels(data: bytes, mode: str) -> bytes:
+    """Simulate a packed RGB buffer (3 bytes per pixel), transforming each distinct color once."""
+    if mode == "normal":
+        return bytes(data)
+    source = memoryview(data)
+    count = len(source) // 3
+    packed = [source[i * 3 : i * 3 + 3].tobytes() for i in range(count)]
+    lookup = {pixel: bytes(simulate_cvd_rgb((pixel[0], pixel[1], pixel[2]), mode)) for pixel in set(packed)}
+    return b"".join(map(lookup.__getitem__, packed))
+
+
+def rgb_to_oklab(rgb: tuple[int, int, int]) -> tuple[float, float, float]:
+    r, g, b = (_SRGB_TO_LINEAR[channel] for channel in rgb)
+    l = (0.4122214708 * r + 0.5363325363 * g + 0.0514459929 * b) ** (1 / 3)
+    m = (0.2119034982 * r + 0.6806995451 * g + 0.1073969566 * b) ** (1 / 3)
+    s = (0.0883024619 * r + 0.2817188376 * g + 0.6299787005 * b) ** (1 / 3)
+    return (
+        0.2104542553 * l + 0.7936177850 * m - 0.0040720468 * s,
+        1.9779984951 * l - 2.4285922050 * m + 0.4505937099 * s,
+        0.0259040371 * l + 0.7827717662 * m - 0.8086757660 * s,
+    )
+
+
+# Smallest OKLab distance at which two swatches still read as different colors.
+CVD_MIN_DISTANCE = 0.04
+
+
+def palette_cvd_conflicts(
+    colors: list[str], modes: tuple[str, ...] = CVD_MODES[1:], threshold: float = CVD_MIN_DISTANCE
+) -> list[tuple[str, str, str, float]]:
+    """Return (mode, color_a, color_b, distance) for every pair that collapses under a simulation."""
+    conflicts: list[tuple[str, str, str, float]] = []
+    for mode in modes:
+        labs = [rgb_to_oklab(_hex_to_rgb(color)) for color in simulate_cvd_palette(colors, mode)]
+        for i in range(len(colors)):
+            for j in range(i + 1, len(colors)):
+                if colors[i] == colors[j]:
+                    continue
+                distance = math.dist(labs[i], labs[j])
+                if distance < threshold:
+                    conflicts.append((mode, colors[i], colors[j], distance))
+    return conflicts
+
+
+def oklab_to_rgb(lab: tuple[float, float, float]) -> tuple[int, int, int]:
+    """Inverse of :func:`rgb_to_oklab`; out-of-gamut channels are clipped."""
+    lightness, a, b = lab
+    l_ = lightness + 0.3963377774 * a + 0.2158037573 * b
+    m_ = lightness - 0.1055613458 * a - 0.0638541728 * b
+    s_ = lightness - 0.0894841775 * a - 1.2914855480 * b
+    l, m, s = l_ * l_ * l_, m_ * m_ * m_, s_ * s_ * s_
+    return (
+        _encode_linear(4.0767416621 * l - 3.3077115913 * m + 0.2309699292 * s),
+        _encode_linear(-1.2684380046 * l + 2.6097574011 * m - 0.3413193965 * s),
+        _encode_linear(-0.0041960863 * l - 0.7034186147 * m + 1.7076147010 * s),
+    )
+
+
+RAMP_SPACES = ("oklab", "oklch", "hsv")
+
+
+def _hue_path(h0: float, h1: float, c0: float, c1: float, period: float) -> tuple[float, float]:
+    """Start hue and signed shortest delta; an achromatic end borrows the other end's hue."""
+    if c0 < 1e-4:
+        h0 = h1
+    if c1 < 1e-4:
+        h1 = h0
+    return h0, (h1 - h0 + period / 2) % period - period / 2
+
+
+def generate_ramp(start: str, end: str, steps: int, space: str = "oklab") -> list[str]:
+    """Interpolate ``steps`` colors from ``start`` to ``end`` (both inclusive) in OKLab, OKLCH or HSV."""
+    if steps <= 0:
+        return []
+    if steps == 1:
+        return [start]
+    ts = [index / (steps - 1) for index in range(steps)]
+    rgb0, rgb1 = _hex_to_rgb(start), _hex_to_rgb(end)
+    if space == "oklab":
+        (l0, a0, b0), (l1, a1, b1) = rgb_to_oklab(rgb0), rgb_to_oklab(rgb1)
+        dl, da, db = l1 - l0, a1 - a0, b1 - b0
+        return [_rgb_to_hex(oklab_to_rgb((l0 + dl * t, a0 + da * t, b0 + db * t))) for t in ts]
+    if space == "oklch":
+        (l0, a0, b0), (l1, a1, b1) = rgb_to_oklab(rgb0), rgb_to_oklab(rgb1)
+        c0, c1 = math.hypot(a0, b0), math.hypot(a1, b1)
+        h0, dh = _hue_path(math.atan2(b0, a0), math.atan2(b1, a1), c0, c1, 2 * math.pi)
+        dl, dc = l1 - l0, c1 - c0
+        return [
+            _rgb_to_hex(
+                oklab_to_rgb((l0 + dl * t, (c0 + dc * t) * math.cos(h0 + dh * t), (c0 + dc * t) * math.sin(h0 + dh * t)))
+            )
+            for t in ts
+        ]
+    if space == "hsv":
+        hsv0 = colorsys.rgb_to_hsv(*(channel / 255 for channel in rgb0))
+        hsv1 = colorsys.rgb_to_hsv(*(channel / 255 for channel in rgb1))
+        h0, dh = _hue_path(hsv0[0], hsv1[0], hsv0[1] * hsv0[2], hsv1[1] * hsv1[2], 1.0)
+        ds, dv = hsv1[1] - hsv0[1], hsv1[2] - hsv0[2]
+        return [_hsv_to_hex(((h0 + dh * t) % 1.0) * 360.0, (hsv0[1] + ds * t) * 100.0, (hsv0[2] + dv * t) * 100.0) for t in ts]
+    raise ValueError(f"unknown interpolation space {space!r}; expected one of {', '.join(RAMP_SPACES)}")
+
+
+def tint_shade_scale(color: str, tints: int = 4, shades: int = 4, space: str = "oklab") -> list[str]:
+    """Lightest tint to darkest shade around ``color``, excluding pure white and black."""
+    lighter = generate_ramp("#FFFFFF", color, tints + 2, space)[1:-1]
+    darker = generate_ramp(color, "#000000", shades + 2, space)[1:-1]
+    return lighter + [color] + darker
+
+
+def ramp_strip_row(colors: list[str], width: int) -> bytes:
+    """One packed RGB row of ``width`` pixels showing ``colors`` as equal-width bands."""
+    if not colors or width <= 0:
+        return b""
+    packed = bytes.fromhex("".join(color[1:] for color in colors))
+    count = len(colors)
+    return b"".join(packed[(x * count // width) * 3 : (x * count // width) * 3 + 3] for x in range(width))
+
+
 def hsv_triangle_vertices(cx: float, cy: float, radius: float, hue: float) -> tuple[tuple[float, float], tuple[float, float], tuple[float, float]]:
     angle = math.radians(hue)
     ux = math.cos(angle)
@@ -79,31 +368,1351 @@ def sv_from_barycentric(weights: tuple[float, float, float]) -> tuple[float, flo
     return saturation, value
 
 
+_HUE_STEPS = 720
+_HUE_RING_COLORS = b"".join(
+    bytes(int(round(channel * 255)) for channel in colorsys.hsv_to_rgb(step / _HUE_STEPS, 1.0, 1.0))
+    for step in range(_HUE_STEPS)
+)
+
+
+def hue_ring_band(
+    size: int, center: float, inner_radius: float, outer_radius: float, background: bytes, row_start: int, row_end: int
+) -> bytes:
+    """Render rows ``row_start:row_end`` of a ``size``-pixel square hue ring as packed RGB."""
+    rows = bytearray()
+    blank = background * size
+    outer_sq = outer_radius * outer_radius
+    inner_sq = inner_radius * inner_radius
+    degrees_per_radian = _HUE_STEPS / (2 * math.pi)
+    for y in range(row_start, row_end):
+        row = bytearray(blank)
+        dy = y + 0.5 - center
+        if dy * dy < outer_sq:
+            outer_half = math.sqrt(outer_sq - dy * dy)
+            inner_half = math.sqrt(inner_sq - dy * dy) if dy * dy < inner_sq else 0.0
+            spans = (
+                (center - outer_half, center - inner_half),
+                (center + inner_half, center + outer_half),
+            )
+            for left, right in spans:
+                x0 = max(0, math.ceil(left - 0.5))
+                x1 = min(size - 1, math.floor(right - 0.5))
+                if x1 < x0:
+                    continue
+                pixels = bytearray()
+                for x in range(x0, x1 + 1):
+                    step = int(math.atan2(dy, x + 0.5 - center) * degrees_per_radian) % _HUE_STEPS * 3
+                    pixels += _HUE_RING_COLORS[step : step + 3]
+                row[x0 * 3 : (x1 + 1) * 3] = pixels
+        rows += row
+    return bytes(rows)
+
+
+def paint_triangle_band(
+    buffer: bytearray,
+    size: int,
+    vertices: tuple[tuple[float, float], tuple[float, float], tuple[float, float]],
+    hue: float,
+    row_start: int,
+    row_end: int,
+) -> None:
+    """Paint the saturation/value triangle into rows ``row_start:row_end`` of a packed RGB buffer.
+
+    For a fixed hue, RGB is linear in the barycentric weights (tip = pure hue, then
+    white, then black), so each row is a single affine span with no per-pixel HSV math.
+    """
+    (ax, ay), (bx, by), (cx, cy) = vertices
+    denominator = (by - cy) * (ax - cx) + (cx - bx) * (ay - cy)
+    if abs(denominator) < 1e-10:
+        return
+    hue_rgb = colorsys.hsv_to_rgb(_clamp(hue, 0.0, 360.0) / 360.0, 1.0, 1.0)
+    ka, kb = [255.0 * channel for channel in hue_rgb], 255.0
+    a_dx = (by - cy) / denominator
+    b_dx = (cy - ay) / denominator
+    for y in range(max(0, row_start), min(size, row_end)):
+        py = y + 0.5
+        a0 = ((cx - bx) * (py - cy) - (by - cy) * cx) / denominator
+        b0 = ((ax - cx) * (py - cy) - (cy - ay) * cx) / denominator
+        low, high = 0.0, float(size)
+        for slope, offset in ((a_dx, a0), (b_dx, b0), (-a_dx - b_dx, 1.0 - a0 - b0)):
+            if abs(slope) < 1e-12:
+                if offset < 0.0:
+                    low, high = 1.0, 0.0
+            elif slope > 0.0:
+                low = max(low, -offset / slope)
+            else:
+                high = min(high, -offset / slope)
+        x0 = max(0, math.ceil(low - 0.5))
+        x1 = min(size - 1, math.floor(high - 0.5))
+        if x1 < x0:
+            continue
+        pixels = bytearray()
+        for x in range(x0, x1 + 1):
+            wa = a_dx * (x + 0.5) + a0
+            wb = kb * (b_dx * (x + 0.5) + b0)
+            pixels += bytes(
+                (
+                    min(255, max(0, int(wb + wa * ka[0] + 0.5))),
+                    min(255, max(0, int(wb + wa * ka[1] + 0.5))),
+                    min(255, max(0, int(wb + wa * ka[2] + 0.5))),
+                )
+            )
+        start = (y * size + x0) * 3
+        buffer[start : start + len(pixels)] = pixels
+
+
+def pack_hex_colors(values) -> array:
+    """Sanitize HEX strings with :func:`normalize_hex` and pack the valid ones as ``0xRRGGBB`` uint32."""
+    packed = array("I")
+    for value in values:
+        hex_value = normalize_hex(value)
+        if hex_value is not None:
+            packed.append(int(hex_value[1:], 16))
+    return packed
+
+
+class PackedColorResult:
+    """Per-color output of :func:`process_packed_colors`, in input order."""
+
+    HEX_WIDTH = 7
+
+    def __init__(self, hex_codes: bytes, hsv: array, luminance: array, contrast: array) -> None:
+        self.hex_codes = hex_codes
+        self.hsv = hsv
+        self.luminance = luminance
+        self.contrast = contrast
+
+    def __len__(self) -> int:
+        return len(self.luminance)
+
+    def hex_at(self, index: int) -> str:
+        return self.hex_codes[index * self.HEX_WIDTH : (index + 1) * self.HEX_WIDTH].decode("ascii")
+
+
+# name -> (bytes per color, array typecode) for each shared-memory output buffer.
+_PACKED_OUTPUTS = {"hex": (7, "B"), "hsv": (12, "f"), "luminance": (8, "d"), "contrast": (8, "d")}
+
+
+def _process_packed_chunk(names: dict[str, str], start: int, stop: int, background: tuple[int, int, int]) -> None:
+    """Worker: read ``packed[start:stop]`` from shared memory and write each output at the same offsets."""
+    blocks = {key: shared_memory.SharedMemory(name=name) for key, name in names.items()}
+    views = {}
+    try:
+        views["packed"] = blocks["packed"].buf.cast("I")
+        views["hex"] = blocks["hex"].buf
+        for key in ("hsv", "luminance", "contrast"):
+            views[key] = blocks[key].buf.cast(_PACKED_OUTPUTS[key][1])
+        packed, hex_out, hsv_out = views["packed"], views["hex"], views["hsv"]
+        lum_out, contrast_out = views["luminance"], views["contrast"]
+        background_lum = relative_luminance(background)
+        for index in range(start, stop):
+            value = packed[index] & 0xFFFFFF
+            rgb = (value >> 16, (value >> 8) & 0xFF, value & 0xFF)
+            hex_out[index * 7 : index * 7 + 7] = _rgb_to_hex(rgb).encode("ascii")
+            h, s, v = colorsys.rgb_to_hsv(rgb[0] / 255, rgb[1] / 255, rgb[2] / 255)
+            hsv_out[index * 3] = h * 360.0
+            hsv_out[index * 3 + 1] = s * 100.0
+            hsv_out[index * 3 + 2] = v * 100.0
+            luminance = relative_luminance(rgb)
+            lum_out[index] = luminance
+            contrast_out[index] = _luminance_contrast(luminance, background_lum)
+    finally:
+        for view in views.values():
+            view.release()
+        for block in blocks.values():
+            block.close()
+
+
+def process_packed_colors(
+    packed: array,
+    background: tuple[int, int, int] = (255, 255, 255),
+    workers: int | None = None,
+    chunk_size: int = 1 << 16,
+) -> PackedColorResult:
+    """Convert and contrast-score packed ``0xRRGGBB`` colors across a process pool.
+
+    Input and outputs live in ``multiprocessing.shared_memory`` blocks; workers only
+    receive block names and an index range, so no per-color objects are pickled.
+    Every chunk writes to its own offsets, which keeps the output order deterministic.
+    """
+    count = len(packed)
+    workers = workers or os.cpu_count() or 1
+    sizes = {"packed": 4, **{key: width for key, (width, _) in _PACKED_OUTPUTS.items()}}
+    blocks = {key: shared_memory.SharedMemory(create=True, size=max(1, count * width)) for key, width in sizes.items()}
+    try:
+        blocks["packed"].buf[: count * 4] = memoryview(packed).cast("B")
+        names = {key: block.name for key, block in blocks.items()}
+        tasks = [(names, start, min(count, start + chunk_size), background) for start in range(0, count, chunk_size)]
+        if workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                _process_packed_chunk(*task)
+        else:
+            with multiprocessing.Pool(min(workers, len(tasks))) as pool:
+                pool.starmap(_process_packed_chunk, tasks, chunksize=1)
+        return PackedColorResult(
+            bytes(blocks["hex"].buf[: count * 7]),
+            array("f", bytes(blocks["hsv"].buf[: count * 12])),
+            array("d", bytes(blocks["luminance"].buf[: count * 8])),
+            array("d", bytes(blocks["contrast"].buf[: count * 8])),
+        )
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+
+# Binary palette (.cpal) layout, little-endian:
+#   header   magic "CPAL", version u16, flags u16, count u32, favorites u32,
+#            records/names/index offsets u64 (names offset is 0 without names)
+#   records  count x u32 RGBA (0xRRGGBBAA); favorites first, then history
+#   names    (count + 1) x u32 byte offsets into a UTF-8 blob that follows them
+#   index    (buckets + 1) x u32 bucket starts, then count x u32 record numbers grouped by
+#            (hue bucket, lightness bucket) in HLS space
+_CPAL_MAGIC = b"CPAL"
+_CPAL_VERSION = 1
+_CPAL_HAS_NAMES = 0x1
+_CPAL_HEADER = struct.Struct("<4sHHIIQQQ")
+CPAL_HUE_BUCKETS = 12
+CPAL_LIGHTNESS_BUCKETS = 10
+
+
+def _cpal_bucket(rgb: tuple[int, int, int]) -> int:
+    h, l, _ = colorsys.rgb_to_hls(rgb[0] / 255, rgb[1] / 255, rgb[2] / 255)
+    hue_bin = min(CPAL_HUE_BUCKETS - 1, int(h * CPAL_HUE_BUCKETS))
+    light_bin = min(CPAL_LIGHTNESS_BUCKETS - 1, int(l * CPAL_LIGHTNESS_BUCKETS))
+    return hue_bin * CPAL_LIGHTNESS_BUCKETS + light_bin
+
+
+def _pad8(data: bytearray) -> None:
+    data += b"\0" * (-len(data) % 8)
+
+
+def _le_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_binary_palette(
+    path: str | Path, favorites: list[str], history: Iterable[str] = (), names: dict[str, str] | None = None
+) -> None:
+    """Write normalized HEX colors (see :func:`sanitize_palette`) as a ``.cpal`` file."""
+    colors = list(favorites) + list(history)
+    records = array("I", ((int(color[1:], 16) << 8) | 0xFF for color in colors))
+    buckets = [_cpal_bucket(_hex_to_rgb(color)) for color in colors]
+    bucket_count = CPAL_HUE_BUCKETS * CPAL_LIGHTNESS_BUCKETS
+    starts = array("I", bytes(4 * (bucket_count + 1)))
+    for bucket in buckets:
+        starts[bucket + 1] += 1
+    for bucket in range(bucket_count):
+        starts[bucket + 1] += starts[bucket]
+    order = array("I", bytes(4 * len(colors)))
+    fill = array("I", starts[:-1])
+    for position, bucket in enumerate(buckets):
+        order[fill[bucket]] = position
+        fill[bucket] += 1
+
+    body = bytearray(b"\0" * _CPAL_HEADER.size)
+    _pad8(body)
+    records_offset = len(body)
+    body += _le_bytes(records)
+    names_offset = 0
+    if names:
+        _pad8(body)
+        names_offset = len(body)
+        blob = bytearray()
+        offsets = array("I", [0])
+        for color in colors:
+            blob += names.get(color, "").encode("utf-8")
+            offsets.append(len(blob))
+        body += _le_bytes(offsets) + blob
+    _pad8(body)
+    index_offset = len(body)
+    body += _le_bytes(starts) + _le_bytes(order)
+    flags = _CPAL_HAS_NAMES if names else 0
+    body[: _CPAL_HEADER.size] = _CPAL_HEADER.pack(
+        _CPAL_MAGIC, _CPAL_VERSION, flags, len(colors), len(favorites), records_offset, names_offset, index_offset
+    )
+    with open(path, "wb") as file:
+        file.write(body)
+
+
+class BinaryPalette:
+    """Read-only, memory-mapped view of a ``.cpal`` file.
+
+    Opening only parses the header; records, names and the index are exposed as
+    zero-copy ``memoryview`` casts over the mapping, so pages load on first access.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        if sys.byteorder == "big":
+            raise OSError("memory-mapped .cpal files require a little-endian host")
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        buffer = memoryview(self._map)
+        self._views = [buffer]
+        try:
+            magic, version, flags, count, favorites, records_offset, names_offset, index_offset = (
+                _CPAL_HEADER.unpack_from(buffer)
+            )
+            if magic != _CPAL_MAGIC or version != _CPAL_VERSION:
+                raise ValueError(f"{self.path} is not a version {_CPAL_VERSION} .cpal palette")
+            if favorites > count:
+                raise ValueError(f"{self.path} is corrupt: more favorites than records")
+            self.count = count
+            self.favorites_count = favorites
+            self.records = self._view(records_offset, count)
+            self._name_offsets = self._view(names_offset, count + 1) if flags & _CPAL_HAS_NAMES else None
+            self._names_blob = names_offset + 4 * (count + 1)
+            bucket_count = CPAL_HUE_BUCKETS * CPAL_LIGHTNESS_BUCKETS
+            self._bucket_starts = self._view(index_offset, bucket_count + 1)
+            self._bucket_order = self._view(index_offset + 4 * (bucket_count + 1), count)
+            # The bucket table is tiny, so check it here; record numbers are checked per bucket on use.
+            starts = self._bucket_starts.tolist()
+            if starts[0] != 0 or starts[-1] != count or any(a > b for a, b in zip(starts, starts[1:])):
+                raise ValueError(f"{self.path} is corrupt: bad index bucket table")
+        except Exception:
+            self.close()
+            raise
+
+    def _view(self, offset: int, length: int) -> memoryview:
+        if offset + 4 * length > len(self._map):
+            raise ValueError(f"{self.path} is truncated")
+        view = self._views[0][offset : offset + 4 * length].cast("I")
+        self._views.append(view)
+        return view
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> str:
+        return f"#{self.records[index] >> 8:06X}"
+
+    def __enter__(self) -> BinaryPalette:
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+        self._file.close()
+
+    def name(self, index: int) -> str | None:
+        if self._name_offsets is None:
+            return None
+        start, end = self._name_offsets[index], self._name_offsets[index + 1]
+        return self._map[self._names_blob + start : self._names_blob + end].decode("utf-8") or None
+
+    def bucket(self, hue_bin: int, light_bin: int) -> memoryview:
+        """Record numbers whose HLS hue and lightness fall in the given index bucket."""
+        bucket = hue_bin * CPAL_LIGHTNESS_BUCKETS + light_bin
+        records = self._bucket_order[self._bucket_starts[bucket] : self._bucket_starts[bucket + 1]]
+        if len(records) and max(records) >= self.count:
+            raise ValueError(f"{self.path} is corrupt: index refers past the last record")
+        return records
+
+    def query(self, hue: tuple[float, float] = (0.0, 360.0), lightness: tuple[float, float] = (0.0, 100.0)) -> list[int]:
+        """Record numbers within a hue range (degrees) and lightness range (percent), using the index.
+
+        A hue range whose start exceeds its end wraps through 0°, like ``h:350-10`` in
+        :class:`PaletteIndex` queries.
+        """
+        if hue[0] > hue[1]:
+            return sorted(self.query((hue[0], 360.0), lightness) + self.query((0.0, hue[1]), lightness))
+        hue_bins = range(int(hue[0] / 360 * CPAL_HUE_BUCKETS), min(CPAL_HUE_BUCKETS, int(hue[1] / 360 * CPAL_HUE_BUCKETS) + 1))
+        light_bins = range(
+            int(lightness[0] / 100 * CPAL_LIGHTNESS_BUCKETS),
+            min(CPAL_LIGHTNESS_BUCKETS, int(lightness[1] / 100 * CPAL_LIGHTNESS_BUCKETS) + 1),
+        )
+        matches: list[int] = []
+        for hue_bin in hue_bins:
+            for light_bin in light_bins:
+                for index in self.bucket(hue_bin, light_bin):
+                    rgb = self.records[index] >> 8
+                    h, l, _ = colorsys.rgb_to_hls((rgb >> 16) / 255, ((rgb >> 8) & 0xFF) / 255, (rgb & 0xFF) / 255)
+                    if hue[0] <= h * 360 <= hue[1] and lightness[0] <= l * 100 <= lightness[1]:
+                        matches.append(index)
+        matches.sort()
+        return matches
+
+    def to_payload(self) -> dict:
+        """Return the palette in the JSON export schema (``favorites``/``history``, plus ``names`` if any)."""
+        colors = [self[index] for index in range(self.count)]
+        payload = {"favorites": colors[: self.favorites_count], "history": colors[self.favorites_count :]}
+        if self._name_offsets is not None:
+            payload["names"] = {colors[i]: name for i in range(self.count) if (name := self.name(i))}
+        return payload
+
+
+def write_palette_file(path: str | Path, payload: dict, dedupe: bool = True) -> None:
+    """Write an export payload as JSON, or as ``.cpal`` when the path has that suffix.
+
+    ``.cpal`` colors are normalized and, unless ``dedupe`` is false (e.g. for ramps,
+    whose repeated steps are positions), de-duplicated.
+    """
+    if Path(path).suffix.lower() == ".cpal":
+        names = payload.get("names")
+        if isinstance(names, dict):
+            names = {normalize_hex(color): name for color, name in names.items() if isinstance(name, str)}
+        favorites, history = (
+            sanitize_palette(payload.get(key, []))
+            if dedupe
+            else [color for color in map(normalize_hex, payload.get(key, [])) if color is not None]
+            for key in ("favorites", "history")
+        )
+        write_binary_palette(path, favorites, history, names if isinstance(names, dict) else None)
+        return
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(payload, file, indent=2)
+
+
+def read_palette_payload(path: str | Path) -> dict:
+    """Read a JSON or ``.cpal`` palette into the JSON export schema."""
+    if Path(path).suffix.lower() == ".cpal":
+        with BinaryPalette(path) as palette:
+            return palette.to_payload()
+    with open(path, "r", encoding="utf-8") as file:
+        payload = json.load(file)
+    if not isinstance(payload, dict):
+        payload = {"favorites": payload, "history": []}
+    return payload
+
+
+def read_palette_colors(path: str | Path, limit: int | None = None) -> tuple[list[str], list[str]]:
+    """Sanitized favorites and history of a palette file, each cut to ``limit`` colors.
+
+    ``.cpal`` records are read lazily from the mapping and are already normalized, so
+    a small limit touches only the first few records however large the file is.
+    """
+    if Path(path).suffix.lower() != ".cpal":
+        payload = read_palette_payload(path)
+        return sanitize_palette(payload.get("favorites", []), limit), sanitize_palette(payload.get("history", []), limit)
+    with BinaryPalette(path) as palette:
+        sections = (range(palette.favorites_count), range(palette.favorites_count, len(palette)))
+        if limit is None:
+            return tuple(list(dict.fromkeys(map(palette.__getitem__, section))) for section in sections)
+        result = []
+        for section in sections:
+            unique: dict[str, None] = {}
+            for index in section:
+                if len(unique) >= limit:
+                    break
+                unique[palette[index]] = None
+            result.append(list(unique))
+        return result[0], result[1]
+
+
+def _run_steps(steps):
+    """Drive a step generator to completion and return its result."""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+
+
+def _run_slice(steps, budget: float) -> None:
+    """Advance a step generator for one ``after`` slice of about ``budget`` seconds.
+
+    The first step always runs; after that each step's duration predicts the next,
+    and the slice ends before a step that would overrun the budget. The generator's
+    ``StopIteration`` (carrying its result) propagates to the caller.
+    """
+    deadline = time.perf_counter() + budget
+    step = None
+    while True:
+        started = time.perf_counter()
+        if step is not None and started + step > deadline:
+            return
+        next(steps)
+        step = time.perf_counter() - started
+
+
+class _TrieNode:
+    __slots__ = ("children", "items")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.items: set[str] = set()
+
+
+class PaletteIndex:
+    """Incrementally maintained search index over a list of ``#RRGGBB`` colors.
+
+    Each color carries an order key (its position in the list it mirrors) and a slot
+    number. Hue and lightness ranges are answered from one-degree and one-percent slot
+    bitmaps (big ints), hex prefixes from a trie and ``near`` queries from a coarse
+    OKLab grid; remaining terms are applied as ``itertools.compress`` filters so no
+    per-color Python loop runs even when most of the palette matches.
+
+    Each query method has a ``*_steps`` generator form that yields after every bounded
+    chunk (``CHUNK`` colors or ``CELLS_PER_STEP`` grid cells), so callers can spread a
+    large search over several frames; the plain methods simply run it to completion.
+    """
+
+    NEAR_RADIUS = 0.08
+    OKLAB_CELL = 0.04
+    CHUNK = 2048
+    CELLS_PER_STEP = 64
+    _BIT_SELECTORS = bytes.maketrans(b"01", b"\x00\x01")
+
+    def __init__(self) -> None:
+        self._keys: dict[str, float] = {}
+        self._slot: dict[str, int] = {}
+        self._slots: list[str | None] = []
+        self._slots_ordered = True
+        self._hue: dict[str, int] = {}
+        self._lightness: dict[str, int] = {}
+        self._lab: dict[str, tuple[float, float, float]] = {}
+        self._trie = _TrieNode()
+        self._bitmaps = {"hue": [bytearray() for _ in range(360)], "lightness": [bytearray() for _ in range(101)]}
+        self._masks: dict[tuple[str, int], int] = {}
+        self._oklab_cells: dict[tuple[int, int, int], set[str]] = {}
+        self._ordered: list[str] | None = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, color: str) -> bool:
+        return color in self._keys
+
+    def key(self, color: str) -> float:
+        return self._keys[color]
+
+    def add(self, color: str, key: float) -> None:
+        if color in self._keys:
+            self.remove(color)
+        rgb = _hex_to_rgb(color)
+        h, l, _ = colorsys.rgb_to_hls(rgb[0] / 255, rgb[1] / 255, rgb[2] / 255)
+        hue, lightness, lab = int(round(h * 360)) % 360, int(round(l * 100)), rgb_to_oklab(rgb)
+        slot = len(self._slots)
+        self._slots.append(color)
+        self._slot[color] = slot
+        self._hue[color], self._lightness[color], self._lab[color] = hue, lightness, lab
+        node = self._trie
+        node.items.add(color)
+        for digit in color[1:]:
+            node = node.children.setdefault(digit, _TrieNode())
+            node.items.add(color)
+        self._set_bit("hue", hue, slot, True)
+        self._set_bit("lightness", lightness, slot, True)
+        self._oklab_cells.setdefault(self._oklab_cell(lab), set()).add(color)
+        # Palette edits append or prepend, so the sorted order can usually be patched in place.
+        ordered = self._ordered
+        if ordered is not None and (not ordered or key > self._keys[ordered[-1]]):
+            ordered.append(color)
+        elif ordered is not None and key < self._keys[ordered[0]]:
+            ordered.insert(0, color)
+            self._slots_ordered = False
+        else:
+            self._ordered = None
+            self._slots_ordered = False
+        self._keys[color] = key
+
+    def remove(self, color: str) -> None:
+        if color not in self._keys:
+            return
+        del self._keys[color]
+        slot = self._slot.pop(color)
+        self._slots[slot] = None
+        hue, lightness, lab = self._hue.pop(color), self._lightness.pop(color), self._lab.pop(color)
+        node = self._trie
+        node.items.discard(color)
+        for digit in color[1:]:
+            child = node.children[digit]
+            child.items.discard(color)
+            if not child.items:
+                del node.children[digit]
+                break
+            node = child
+        self._set_bit("hue", hue, slot, False)
+        self._set_bit("lightness", lightness, slot, False)
+        cell = self._oklab_cell(lab)
+        self._oklab_cells[cell].discard(color)
+        if not self._oklab_cells[cell]:
+            del self._oklab_cells[cell]
+        if self._ordered is not None:
+            self._ordered.remove(color)
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def _set_bit(self, kind: str, bucket: int, slot: int, value: bool) -> None:
+        bits = self._bitmaps[kind][bucket]
+        byte = slot >> 3
+        if len(bits) <= byte:
+            bits.extend(bytes(byte + 1 - len(bits)))
+        if value:
+            bits[byte] |= 1 << (slot & 7)
+        else:
+            bits[byte] &= ~(1 << (slot & 7)) & 0xFF
+        self._masks.pop((kind, bucket), None)
+
+    def _range_mask_steps(self, kind: str, buckets):
+        """OR of the slot bitmaps of ``buckets``; each bucket's int is cached until it changes."""
+        mask = rebuilt = 0
+        for bucket in buckets:
+            bucket_mask = self._masks.get((kind, bucket))
+            if bucket_mask is None:
+                rebuilt += 1
+                if rebuilt % 32 == 0:
+                    yield
+                bucket_mask = self._masks[kind, bucket] = int.from_bytes(self._bitmaps[kind][bucket], "little")
+            mask |= bucket_mask
+        return mask
+
+    def _colors(self, mask: int) -> list[str]:
+        """Colors whose slot bits are set in ``mask``, in key order."""
+        selectors = format(mask, "b")[::-1].encode("ascii").translate(self._BIT_SELECTORS)
+        colors = list(itertools.compress(self._slots, selectors))
+        if not self._slots_ordered:
+            colors.sort(key=self._keys.__getitem__)
+        return colors
+
+    @classmethod
+    def _oklab_cell(cls, lab: tuple[float, float, float]) -> tuple[int, int, int]:
+        return (
+            math.floor(lab[0] / cls.OKLAB_CELL),
+            math.floor(lab[1] / cls.OKLAB_CELL),
+            math.floor(lab[2] / cls.OKLAB_CELL),
+        )
+
+    def prefix(self, digits: str) -> set[str]:
+        node = self._trie
+        for digit in digits.upper().lstrip("#"):
+            node = node.children.get(digit)
+            if node is None:
+                return set()
+        return node.items
+
+    @staticmethod
+    def _hue_degrees(start: int, end: int) -> list[int]:
+        """Whole degrees in ``start..end``; wraps when ``start > end``."""
+        start, end = start % 360, end % 360 if end != 360 else 359
+        return [*range(start, end + 1)] if start <= end else [*range(start, 360), *range(0, end + 1)]
+
+    @staticmethod
+    def _lightness_percents(start: int, end: int) -> range:
+        return range(max(0, start), min(100, end) + 1)
+
+    def hue_range(self, start: int, end: int) -> set[str]:
+        """Colors whose HSL hue lies in ``start..end`` degrees; wraps when ``start > end``."""
+        return set(self._colors(_run_steps(self._range_mask_steps("hue", self._hue_degrees(start, end)))))
+
+    def lightness_range(self, start: int, end: int) -> set[str]:
+        return set(self._colors(_run_steps(self._range_mask_steps("lightness", self._lightness_percents(start, end)))))
+
+    def near(self, color: str, radius: float = NEAR_RADIUS) -> set[str]:
+        return _run_steps(self.near_steps(color, radius))
+
+    def near_steps(self, color: str, radius: float = NEAR_RADIUS):
+        target = rgb_to_oklab(_hex_to_rgb(color))
+        low = self._oklab_cell(tuple(component - radius for component in target))
+        high = self._oklab_cell(tuple(component + radius for component in target))
+        size = self.OKLAB_CELL
+        matches: set[str] = set()
+        boundary: list[str] = []
+        cells = itertools.product(*(range(low[axis], high[axis] + 1) for axis in range(3)))
+        for count, cell in enumerate(cells, 1):
+            if count % self.CELLS_PER_STEP == 0:
+                yield
+            members = self._oklab_cells.get(cell)
+            if not members:
+                continue
+            edges = [(cell[axis] * size - target[axis], (cell[axis] + 1) * size - target[axis]) for axis in range(3)]
+            if math.hypot(*(max(lower, -upper, 0.0) for lower, upper in edges)) > radius:
+                continue
+            # Cells entirely inside the sphere are taken whole; only straddling cells are tested per color.
+            if math.hypot(*(max(-lower, upper) for lower, upper in edges)) <= radius:
+                matches |= members
+            else:
+                boundary.extend(members)
+        for start in range(0, len(boundary), self.CHUNK):
+            yield
+            chunk = boundary[start : start + self.CHUNK]
+            distances = map(math.dist, itertools.repeat(target), map(self._lab.__getitem__, chunk))
+            matches.update(itertools.compress(chunk, map(radius.__ge__, distances)))
+        return matches
+
+    @staticmethod
+    def parse_query(query: str) -> list[tuple]:
+        """Split a filter query into terms; incomplete terms are dropped so typing stays stable.
+
+        Terms: a hex prefix (``#3A`` or ``3a``), ``h:200-240``, ``l:30-60`` and
+        ``near:#336699`` with an optional OKLab radius (``near:#336699~0.05``).
+        """
+        terms: list[tuple] = []
+        for term in query.split():
+            kind, _, argument = term.partition(":")
+            kind = kind.lower()
+            if not argument:
+                if re.fullmatch(r"#?[0-9A-Fa-f]{1,6}", term):
+                    terms.append(("prefix", term.lstrip("#").upper()))
+            elif kind in ("h", "hue", "l", "light", "lightness"):
+                bounds = re.fullmatch(r"(\d{1,3})-(\d{1,3})", argument)
+                if bounds:
+                    terms.append(("hue" if kind in ("h", "hue") else "lightness", int(bounds.group(1)), int(bounds.group(2))))
+            elif kind == "near":
+                color, _, radius = argument.partition("~")
+                if re.fullmatch(r"#?([0-9A-Fa-f]{3}|[0-9A-Fa-f]{6})", color) and re.fullmatch(r"(\d*\.?\d+)?", radius):
+                    terms.append(("near", normalize_hex(color), float(radius) if radius else PaletteIndex.NEAR_RADIUS))
+        return terms
+
+    def search(self, query: str) -> set[str] | None:
+        """Colors matching every term in ``query``; None means nothing is filtered."""
+        terms = self.parse_query(query)
+        return set(self.select(terms)) if terms else None
+
+    def select(self, terms: list[tuple]) -> list[str]:
+        return _run_steps(self.select_steps(terms))
+
+    def select_steps(self, terms: list[tuple]):
+        """Colors matching every parsed term, in key order.
+
+        The smallest cheap candidate list (a trie node or the ANDed range bitmaps) is
+        materialised and the other terms filter it; ``near`` builds its own candidate
+        set only when it is the sole term kind.
+        """
+        ranges = [term for term in terms if term[0] in ("hue", "lightness")]
+        prefixes = sorted((term for term in terms if term[0] == "prefix"), key=lambda term: len(self.prefix(term[1])))
+        rest = [term for term in terms if term[0] == "near"] + prefixes[1:]
+        mask = None
+        for kind, start, end in ranges:
+            buckets = self._hue_degrees(start, end) if kind == "hue" else self._lightness_percents(start, end)
+            term_mask = yield from self._range_mask_steps(kind, buckets)
+            mask = term_mask if mask is None else mask & term_mask
+        if prefixes and (mask is None or len(self.prefix(prefixes[0][1])) < bin(mask).count("1")):
+            colors = yield from self._ordered_steps(self.prefix(prefixes[0][1]))
+            rest += ranges
+        elif mask is not None:
+            colors = self._colors(mask)
+            rest += prefixes[:1]
+        elif rest:
+            matches = yield from self.near_steps(*rest[0][1:])
+            colors = yield from self._ordered_steps(matches)
+            rest = rest[1:]
+        else:
+            return list(self.ordered())
+        return (yield from self.refine_steps(colors, rest))
+
+    def refine(self, colors: list[str], terms: list[tuple]) -> list[str]:
+        """Keep the indexed ``colors`` matching every parsed term, preserving their order."""
+        return _run_steps(self.refine_steps(colors, terms))
+
+    def refine_steps(self, colors: list[str], terms: list[tuple]):
+        for kind, *arguments in terms:
+            if kind == "prefix":
+                test = functools.partial(self._prefix_selectors, "#" + arguments[0])
+            elif kind == "hue":
+                test = functools.partial(self._lookup_selectors, self._hue, set(self._hue_degrees(*arguments)))
+            elif kind == "lightness":
+                test = functools.partial(self._lookup_selectors, self._lightness, self._lightness_percents(*arguments))
+            else:
+                target = rgb_to_oklab(_hex_to_rgb(arguments[0]))
+                test = functools.partial(self._distance_selectors, target, arguments[1])
+            kept: list[str] = []
+            for start in range(0, len(colors), self.CHUNK):
+                if start:
+                    yield
+                chunk = colors[start : start + self.CHUNK]
+                kept.extend(itertools.compress(chunk, test(chunk)))
+            colors = kept
+        return colors
+
+    @staticmethod
+    def _prefix_selectors(prefix: str, colors: list[str]):
+        return map(str.startswith, colors, itertools.repeat(prefix))
+
+    @staticmethod
+    def _lookup_selectors(attribute: dict[str, int], allowed, colors: list[str]):
+        return map(allowed.__contains__, map(attribute.__getitem__, colors))
+
+    def _distance_selectors(self, target: tuple[float, float, float], radius: float, colors: list[str]):
+        return map(radius.__ge__, map(math.dist, itertools.repeat(target), map(self._lab.__getitem__, colors)))
+
+    def matches(self, color: str, terms: list[tuple]) -> bool:
+        """Check a single indexed color against parsed terms without building candidate sets."""
+        return bool(self.refine([color], terms))
+
+    @classmethod
+    def narrows(cls, old_terms: list[tuple], new_terms: list[tuple]) -> bool:
+        """True when everything matching ``new_terms`` is known to match ``old_terms`` too."""
+        return all(any(cls._implies(new, old) for new in new_terms) for old in old_terms)
+
+    @classmethod
+    def _implies(cls, new: tuple, old: tuple) -> bool:
+        if new[0] != old[0]:
+            return False
+        if new[0] == "prefix":
+            return new[1].startswith(old[1])
+        if new[0] == "hue":
+            return set(cls._hue_degrees(*new[1:])) <= set(cls._hue_degrees(*old[1:]))
+        if new[0] == "lightness":
+            return old[1] <= new[1] and new[2] <= old[2]
+        return new[1] == old[1] and new[2] <= old[2]
+
+    def ordered(self, matches: set[str] | None = None) -> list[str]:
+        """Return ``matches`` (or every color) sorted by order key."""
+        if self._ordered is None:
+            self._ordered = sorted(self._keys, key=self._keys.__getitem__)
+        if matches is None:
+            return self._ordered
+        return _run_steps(self._ordered_steps(matches))
+
+    def _ordered_steps(self, matches: set[str]):
+        if len(matches) * 8 < len(self._keys):
+            return sorted(matches, key=self._keys.__getitem__)
+        ordered, colors = self.ordered(), []
+        for start in range(0, len(ordered), 8 * self.CHUNK):
+            yield
+            chunk = ordered[start : start + 8 * self.CHUNK]
+            colors.extend(itertools.compress(chunk, map(matches.__contains__, chunk)))
+        return colors
+
+
+def listbox_diff_ops(old: list[str], new: list[str]) -> list[tuple[str, int, object]]:
+    """Edit script turning the Listbox rows ``old`` into ``new``.
+
+    Rows in the longest run the two lists share in the same order stay put; everything
+    else becomes ``("delete", position, count)`` runs followed by ``("insert", position,
+    items)`` runs, with positions valid when applied in order. Rows that stay keep
+    their selection and active state in the Listbox.
+    """
+    old_positions = {item: position for position, item in enumerate(old)}
+    sequence = [old_positions[item] for item in new if item in old_positions]
+    tails: list[int] = []
+    tail_at: list[int] = []
+    back = [-1] * len(sequence)
+    for at, position in enumerate(sequence):
+        length = bisect.bisect_left(tails, position)
+        if length == len(tails):
+            tails.append(position)
+            tail_at.append(at)
+        else:
+            tails[length] = position
+            tail_at[length] = at
+        back[at] = tail_at[length - 1] if length else -1
+    kept = set()
+    at = tail_at[-1] if tail_at else -1
+    while at >= 0:
+        kept.add(old[sequence[at]])
+        at = back[at]
+    ops: list[tuple[str, int, object]] = []
+    position = 0
+    for keep, group in itertools.groupby(old, kept.__contains__):
+        count = sum(1 for _ in group)
+        if keep:
+            position += count
+        else:
+            ops.append(("delete", position, count))
+    position = 0
+    for keep, group in itertools.groupby(new, kept.__contains__):
+        items = list(group)
+        if not keep:
+            ops.append(("insert", position, items))
+        position += len(items)
+    return ops
+
+
+def listbox_rows(height: int, linespace: int) -> int:
+    """Number of ``linespace``-pixel rows needed to fill a Listbox ``height`` pixels tall."""
+    return max(1, -(-height // max(1, linespace)))
+
+
+class PaletteListFilter:
+    """Keep a ``tk.Listbox`` showing the colors of a :class:`PaletteIndex` that match a query.
+
+    The Listbox is virtual: it only ever holds the ``rows`` entries on screen, and the
+    scrollbar and mouse wheel move that window over :attr:`visible`. A query change
+    therefore costs one search plus a diff of the rows on screen, however many colors match;
+    queries that narrow a small result are refined from it instead of searched afresh.
+    Searches run as :class:`PaletteIndex` step generators pumped from ``after`` in
+    ``FRAME_BUDGET`` slices; the previous results stay on screen until they finish.
+    """
+
+    REFINE_LIMIT = 5000
+    FRAME_BUDGET = 0.008
+
+    def __init__(self, listbox: tk.Listbox, scrollbar: ttk.Scrollbar | None = None) -> None:
+        self.listbox = listbox
+        self.scrollbar = scrollbar
+        self.index = PaletteIndex()
+        self.query = ""
+        self.visible: list[str] = []
+        self.first = 0
+        self.rows = int(listbox.cget("height"))
+        self._shown: list[str] = []
+        self._terms: list[tuple] = []
+        self._job = None
+        self._job_terms: list[tuple] | None = None
+        self._job_after_id: str | None = None
+        self._low = 0
+        self._high = -1
+        if scrollbar is not None:
+            scrollbar.configure(command=self.yview)
+        listbox.bind("<MouseWheel>", lambda event: self._scroll(-1 if event.delta > 0 else 1))
+        listbox.bind("<Button-4>", lambda _: self._scroll(-1))
+        listbox.bind("<Button-5>", lambda _: self._scroll(1))
+        listbox.bind("<Configure>", self._on_configure)
+
+    def reset(self, colors: list[str]) -> None:
+        """Reload every color, e.g. after loading or importing a palette."""
+        self.index.clear()
+        for position, color in enumerate(colors):
+            self.index.add(color, position)
+        self._low, self._high = 0, len(colors) - 1
+        if self._job is not None:
+            self._terms = self._job_terms
+            self._cancel_job()
+        self.visible = self.index.select(self._terms)
+        self.first = 0
+        self._render()
+
+    def append(self, color: str) -> None:
+        self.remove(color)
+        self._high += 1
+        self._insert(color, self._high)
+
+    def prepend(self, color: str) -> None:
+        self.remove(color)
+        self._low -= 1
+        self._insert(color, self._low)
+
+    def remove(self, color: str) -> None:
+        if color not in self.index:
+            return
+        self.index.remove(color)
+        self._restart_job()
+        try:
+            position = self.visible.index(color)
+        except ValueError:
+            return
+        del self.visible[position]
+        if position < self.first:
+            self.first -= 1
+        self._render()
+
+    def set_query(self, query: str) -> None:
+        if query == self.query:
+            return
+        self.query = query
+        terms = PaletteIndex.parse_query(query)
+        if terms == (self._job_terms if self._job is not None else self._terms):
+            return
+        self._cancel_job()
+        if terms == self._terms:
+            return
+        if self._terms and len(self.visible) <= self.REFINE_LIMIT and PaletteIndex.narrows(self._terms, terms):
+            self._start_job(terms, self.index.refine_steps(self.visible, terms))
+        else:
+            self._start_job(terms, self.index.select_steps(terms))
+
+    def _start_job(self, terms: list[tuple], steps) -> None:
+        self._job, self._job_terms = steps, terms
+        self._pump_job()
+
+    def _restart_job(self) -> None:
+        """Index edits invalidate a running search; start it again on the current colors."""
+        if self._job is not None:
+            terms = self._job_terms
+            self._cancel_job()
+            self._start_job(terms, self.index.select_steps(terms))
+
+    def _cancel_job(self) -> None:
+        if self._job_after_id is not None:
+            self.listbox.after_cancel(self._job_after_id)
+        self._job = self._job_terms = self._job_after_id = None
+
+    def _pump_job(self) -> None:
+        self._job_after_id = None
+        try:
+            _run_slice(self._job, self.FRAME_BUDGET)
+        except StopIteration as done:
+            self.visible, self._terms = done.value, self._job_terms
+            self._job = self._job_terms = None
+            self.first = 0
+            self._render()
+            return
+        self._job_after_id = self.listbox.after(1, self._pump_job)
+
+    def yview(self, *args) -> None:
+        """Scrollbar ``command``: ``moveto FRACTION`` or ``scroll N units|pages``."""
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.visible))
+        elif args[0] == "scroll":
+            self.first += int(args[1]) * (self.rows if args[2].startswith("page") else 1)
+        self._render()
+
+    def resize(self, rows: int) -> None:
+        if rows != self.rows:
+            self.rows = rows
+            self._render()
+
+    def _scroll(self, units: int) -> str:
+        self.yview("scroll", units, "units")
+        return "break"
+
+    def _on_configure(self, event) -> None:
+        self.resize(listbox_rows(event.height, tkfont.Font(font=self.listbox.cget("font")).metrics("linespace")))
+
+    def _insert(self, color: str, key: float) -> None:
+        self.index.add(color, key)
+        self._restart_job()
+        if self._terms and not self.index.matches(color, self._terms):
+            return
+        if not self.visible or key > self.index.key(self.visible[-1]):
+            position = len(self.visible)
+        elif key < self.index.key(self.visible[0]):
+            position = 0
+        else:
+            position = bisect.bisect_left([self.index.key(item) for item in self.visible], key)
+        self.visible.insert(position, color)
+        if position < self.first:
+            self.first += 1
+        self._render()
+
+    def _render(self) -> None:
+        """Bring the Listbox to the window at ``first`` by editing only the rows that changed."""
+        self.first = max(0, min(self.first, len(self.visible) - self.rows))
+        window = self.visible[self.first : self.first + self.rows]
+        if window != self._shown:
+            for op, position, argument in listbox_diff_ops(self._shown, window):
+                if op == "delete":
+                    self.listbox.delete(position, position + argument - 1)
+                else:
+                    self.listbox.insert(position, *argument)
+            self._shown = window
+        if self.scrollbar is not None:
+            total = len(self.visible) or 1
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.rows) / total))
+
+
+def _remember(cache: OrderedDict, key, value, limit: int) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > limit:
+        cache.popitem(last=False)
+
+
+IMAGE_TILE = 256
+_PPM_HEADER = re.compile(rb"P6(?:\s|#[^\n]*\n)+(\d+)(?:\s|#[^\n]*\n)+(\d+)(?:\s|#[^\n]*\n)+(\d+)\s")
+
+
+def parse_ppm_header(buffer) -> tuple[int, int, int]:
+    """Width, height and pixel-data offset of an 8-bit binary (P6) PPM image."""
+    match = _PPM_HEADER.match(bytes(buffer[:1024]))
+    if match is None:
+        raise ValueError("not a binary (P6) PPM image")
+    width, height, maxval = (int(field) for field in match.groups())
+    if maxval != 255:
+        raise ValueError(f"unsupported PPM maxval {maxval}; only 8-bit images are supported")
+    if width <= 0 or height <= 0 or match.end() + width * height * 3 > len(buffer):
+        raise ValueError("PPM image is empty or truncated")
+    return width, height, match.end()
+
+
+def display_size(width: int, height: int, zoom_exp: int) -> tuple[int, int]:
+    """Size of an image shown at scale ``2 ** zoom_exp``."""
+    if zoom_exp < 0:
+        step = 1 << -zoom_exp
+        return -(-width // step), -(-height // step)
+    return width << zoom_exp, height << zoom_exp
+
+
+def fit_zoom_exp(width: int, height: int, view_width: int, view_height: int, min_exp: int = -12) -> int:
+    """Largest power-of-two scale, at most 1:1, at which the image fits the view."""
+    zoom_exp = 0
+    while zoom_exp > min_exp:
+        shown_width, shown_height = display_size(width, height, zoom_exp)
+        if shown_width <= view_width and shown_height <= view_height:
+            break
+        zoom_exp -= 1
+    return zoom_exp
+
+
+def tile_source_box(
+    tile_x: int, tile_y: int, zoom_exp: int, width: int, height: int, tile: int = IMAGE_TILE
+) -> tuple[int, int, int, int, int]:
+    """Image box ``(x0, y0, x1, y1)`` and read stride behind one display tile.
+
+    Below 1:1 the box is ``tile * step`` pixels wide and reading every ``step``-th pixel
+    gives a quick point-sampled placeholder for the :class:`MipPyramid` tile; above 1:1
+    it covers ``tile >> zoom_exp`` pixels that are then zoomed by Tk.
+    """
+    if zoom_exp < 0:
+        step = 1 << -zoom_exp
+        span = tile * step
+    else:
+        step = 1
+        span = max(1, tile >> zoom_exp)
+    x0, y0 = tile_x * span, tile_y * span
+    return x0, y0, min(width, x0 + span), min(height, y0 + span), step
+
+
+def visible_tiles(
+    left: int, top: int, view_width: int, view_height: int, shown_width: int, shown_height: int, tile: int = IMAGE_TILE
+) -> list[tuple[int, int]]:
+    """Display tiles intersecting the view whose top-left corner is at ``(left, top)``."""
+    first_x, first_y = max(0, left // tile), max(0, top // tile)
+    last_x = min(-(-shown_width // tile), -(-(left + view_width) // tile))
+    last_y = min(-(-shown_height // tile), -(-(top + view_height) // tile))
+    return [(tile_x, tile_y) for tile_y in range(first_y, last_y) for tile_x in range(first_x, last_x)]
+
+
+def sample_box(x: int, y: int, size: int, width: int, height: int) -> tuple[int, int, int, int]:
+    """``size`` x ``size`` box centred on a pixel, clipped to the image."""
+    x0, y0 = x - size // 2, y - size // 2
+    return max(0, x0), max(0, y0), min(width, x0 + size), min(height, y0 + size)
+
+
+def average_rgb(packed: bytes) -> tuple[int, int, int]:
+    count = len(packed) // 3
+    if not count:
+        raise ValueError("no pixels to average")
+    return tuple(round(sum(packed[channel::3]) / count) for channel in range(3))
+
+
+def downsample_rgb(pixels: bytes, width: int, height: int) -> tuple[bytes, int, int]:
+    """Halve packed RGB rows with a 2×2 box filter (rounded mean); odd edges repeat their last pixel.
+
+    Each row's samples of one channel are widened into 16-bit lanes of a single
+    integer, so the four-way sums, rounding and shift all run as big-int arithmetic.
+    """
+    out_width, out_height = -(-width // 2), -(-height // 2)
+    row_bytes, out_row, lanes = width * 3, out_width * 3, out_width * 2
+    rounding = int.from_bytes(b"\x02\x00" * out_width, "little")
+    mask = int.from_bytes(b"\xff\x00" * out_width, "little")
+    wide = bytearray(lanes)
+    out = bytearray(out_row * out_height)
+    for y in range(out_height):
+        top = pixels[2 * y * row_bytes : (2 * y + 1) * row_bytes]
+        bottom = pixels[(2 * y + 1) * row_bytes : (2 * y + 2) * row_bytes] if 2 * y + 1 < height else top
+        if width % 2:
+            top += top[-3:]
+            bottom += bottom[-3:]
+        base = y * out_row
+        for channel in range(3):
+            total = rounding
+            for row in (top, bottom):
+                for first in (channel, channel + 3):
+                    wide[0::2] = row[first::6]
+                    total += int.from_bytes(wide, "little")
+            out[base + channel : base + out_row : 3] = ((total >> 2) & mask).to_bytes(lanes, "little")[0::2]
+    return bytes(out), out_width, out_height
+
+
+def _ppm_photo(master, pixels: bytes, width: int, height: int) -> tk.PhotoImage:
+    header = f"P6\n{width} {height}\n255\n".encode("ascii")
+    return tk.PhotoImage(master=master, data=header + pixels, format="PPM")
+
+
+class MmapRaster:
+    """Memory-mapped binary PPM image.
+
+    Nothing is decoded up front: :meth:`region` slices the rows a tile needs straight
+    out of the mapping, optionally reading only every ``step``-th pixel.
+    """
+
+    # Extra hint for the eyedropper's info line; memory-mapped files need none.
+    NOTE = ""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        try:
+            self.width, self.height, self._offset = parse_ppm_header(self._map)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def region(self, x0: int, y0: int, x1: int, y1: int, step: int = 1) -> bytes:
+        """Packed RGB rows of the box, taking every ``step``-th pixel in both directions."""
+        columns = len(range(x0, x1, step))
+        row_bytes = columns * 3
+        rows = range(y0, y1, step)
+        out = bytearray(row_bytes * len(rows))
+        # Slicing the mmap directly (not a memoryview) keeps strided reads in C.
+        pixels = self._map
+        for index, y in enumerate(rows):
+            start = self._offset + (y * self.width + x0) * 3
+            end = start + (x1 - x0) * 3
+            base = index * row_bytes
+            if step == 1:
+                out[base : base + row_bytes] = pixels[start:end]
+            else:
+                for channel in range(3):
+                    out[base + channel : base + row_bytes : 3] = pixels[start + channel : end : 3 * step]
+        return bytes(out)
+
+    def photo(self, master, x0: int, y0: int, x1: int, y1: int, step: int = 1) -> tk.PhotoImage:
+        pixels = self.region(x0, y0, x1, y1, step)
+        return _ppm_photo(master, pixels, len(range(x0, x1, step)), len(range(y0, y1, step)))
+
+
+class PhotoRaster:
+    """Image decoded by Tk (PNG, GIF, PPM).
+
+    Tk can only decode the whole file at once, so opening blocks for as long as that
+    takes. :meth:`region` reads a box with one ``data`` call, and point-sampled
+    placeholder tiles are cut with ``copy -subsample``.
+    """
+
+    NOTE = "decoded in full on open; convert very large images to binary PPM"
+
+    def __init__(self, master, path: str | Path) -> None:
+        self.path = Path(path)
+        self.image = tk.PhotoImage(master=master, file=str(self.path))
+        self.width, self.height = self.image.width(), self.image.height()
+
+    def close(self) -> None:
+        self.image = None
+
+    def region(self, x0: int, y0: int, x1: int, y1: int, step: int = 1) -> bytes:
+        # Without -format, "data" returns rows of "#rrggbb" colors.
+        rows = self.image.tk.splitlist(self.image.tk.call(self.image, "data", "-from", x0, y0, x1, y1))
+        out = bytearray()
+        for row in rows[::step]:
+            out += bytes.fromhex("".join(self.image.tk.splitlist(row)[::step]).replace("#", ""))
+        return bytes(out)
+
+    def photo(self, master, x0: int, y0: int, x1: int, y1: int, step: int = 1) -> tk.PhotoImage:
+        tile = tk.PhotoImage(master=master)
+        tile.tk.call(tile, "copy", self.image, "-from", x0, y0, x1, y1, "-subsample", step, step)
+        return tile
+
+
+def open_raster(master, path: str | Path) -> MmapRaster | PhotoRaster:
+    """Memory-map binary PPM files; hand every other format to Tk's decoders."""
+    if Path(path).suffix.lower() in (".ppm", ".pnm"):
+        try:
+            return MmapRaster(path)
+        except ValueError:
+            pass
+    return PhotoRaster(master, path)
+
+
+class MipPyramid:
+    """Box-filtered mipmap levels of a raster, built tile by tile on demand.
+
+    Level 0 is the raster itself. A level-``k`` tile (``IMAGE_TILE`` square in level-``k``
+    pixels) is the 2×2 box filter of the four level-``k - 1`` tiles under it, so every
+    pixel shown averages all the source pixels it covers. Filtered tiles of every
+    level share one LRU cache, which lets neighbouring tiles and the next zoom step
+    reuse the levels built on the way.
+    """
+
+    CACHE_LIMIT = 96
+
+    def __init__(self, raster: MmapRaster | PhotoRaster) -> None:
+        self.raster = raster
+        self._tiles: OrderedDict[tuple[int, int, int], tuple[bytes, int, int]] = OrderedDict()
+
+    def level_size(self, level: int) -> tuple[int, int]:
+        return display_size(self.raster.width, self.raster.height, -level)
+
+    def tile(self, level: int, tile_x: int, tile_y: int) -> tuple[bytes, int, int]:
+        return _run_steps(self.tile_steps(level, tile_x, tile_y))
+
+    def tile_steps(self, level: int, tile_x: int, tile_y: int):
+        """Step generator for :meth:`tile`'s ``(pixels, width, height)``; yields after each child tile."""
+        level_width, level_height = self.level_size(level)
+        x0, y0 = tile_x * IMAGE_TILE, tile_y * IMAGE_TILE
+        width, height = min(IMAGE_TILE, level_width - x0), min(IMAGE_TILE, level_height - y0)
+        if level == 0:
+            return self.raster.region(x0, y0, x0 + width, y0 + height), width, height
+        key = (level, tile_x, tile_y)
+        cached = self._tiles.get(key)
+        if cached is not None:
+            self._tiles.move_to_end(key)
+            return cached
+        below_width, below_height = self.level_size(level - 1)
+        half = IMAGE_TILE // 2
+        out = bytearray(width * height * 3)
+        for j in range(2):
+            for i in range(2):
+                child_x, child_y = 2 * tile_x + i, 2 * tile_y + j
+                if child_x * IMAGE_TILE >= below_width or child_y * IMAGE_TILE >= below_height:
+                    continue
+                pixels, child_width, child_height = downsample_rgb(
+                    *(yield from self.tile_steps(level - 1, child_x, child_y))
+                )
+                row_bytes = child_width * 3
+                for row in range(child_height):
+                    start = ((j * half + row) * width + i * half) * 3
+                    out[start : start + row_bytes] = pixels[row * row_bytes : (row + 1) * row_bytes]
+                yield
+        tile = (bytes(out), width, height)
+        _remember(self._tiles, key, tile, self.CACHE_LIMIT)
+        return tile
+
+
 class HsvWheel(ttk.Frame):
+    """Hue ring and saturation/value triangle that scales with its frame.
+
+    The wheel is rendered as an image at several resolution levels, coarsest first.
+    Each level is built in small row bands from an ``after`` loop so that resizing or
+    dragging never blocks the event loop for longer than ``FRAME_BUDGET``.
+    """
+
+    LEVEL_FACTORS = (8, 4, 2, 1)
+    MAX_SIZE = 720
+    RESIZE_DEBOUNCE_MS = 80
+    FRAME_BUDGET = 0.008
+    ROWS_PER_STEP = 4
+    FRAME_CACHE_LIMIT = 8
+    IMAGE_CACHE_LIMIT = 16
+
     def __init__(self, master, on_change, size: int = 240) -> None:
         super().__init__(master)
         self.on_change = on_change
-        self.size = size
-        self.center = size / 2
-        self.outer_radius = size * 0.45
-        self.ring_width = size * 0.11
-        self.inner_radius = self.outer_radius - self.ring_width
-        self.triangle_radius = self.inner_radius * 0.88
+        self.min_size = size
         self.hue = 210.0
         self.saturation = 76.0
         self.value = 86.0
+        self.simulation = "normal"
         self._active_region: str | None = None
+        self._ring_buffers: OrderedDict[tuple[int, int], bytes] = OrderedDict()
+        self._frames: OrderedDict[tuple[int, int, float], bytes] = OrderedDict()
+        self._images: OrderedDict[tuple[int, int, float, str], tk.PhotoImage] = OrderedDict()
+        self._shown_image: tk.PhotoImage | None = None
+        self._job = None
+        self._job_after_id: str | None = None
+        self._resize_after_id: str | None = None
+        self._pending_size = size
 
         self.canvas = tk.Canvas(self, width=size, height=size, highlightthickness=0, bd=0)
         self.canvas.pack()
+        red, green, blue = self.canvas.winfo_rgb(self.canvas.cget("background"))
+        self._background = bytes((red >> 8, green >> 8, blue >> 8))
+        self._image_item = self.canvas.create_image(0, 0, anchor="nw", tags="wheel")
 
-        self._draw_hue_ring()
-        self._draw_triangle()
+        self._set_geometry(size)
+        self._request_render()
         self._draw_handles()
 
         self.canvas.bind("<Button-1>", self._on_press)
         self.canvas.bind("<B1-Motion>", self._on_drag)
         self.canvas.bind("<ButtonRelease-1>", self._on_release)
+        self.bind("<Configure>", self._on_configure)
 
     def set_hsv(self, hue: float, saturation: float, value: float) -> None:
         hue = _clamp(hue, 0.0, 360.0)
@@ -114,57 +1723,140 @@ class HsvWheel(ttk.Frame):
         self.saturation = saturation
         self.value = value
         if hue_changed:
-            self._draw_triangle()
+            self._request_render()
         self._draw_handles()
 
-    def _draw_hue_ring(self) -> None:
-        self.canvas.delete("ring")
-        ring_rect = (
-            self.center - self.outer_radius,
-            self.center - self.outer_radius,
-            self.center + self.outer_radius,
-            self.center + self.outer_radius,
-        )
-        for deg in range(360):
-            color = _hsv_to_hex(float(deg), 100.0, 100.0)
-            self.canvas.create_arc(
-                *ring_rect,
-                start=deg,
-                extent=1.5,
-                style="arc",
-                width=self.ring_width,
-                outline=color,
-                tags="ring",
-            )
+    def set_simulation(self, mode: str) -> None:
+        """Show the wheel through a color-vision simulation, reusing cached renders."""
+        if mode == self.simulation:
+            return
+        self.simulation = mode
+        self._request_render()
 
-    def _draw_triangle(self) -> None:
-        self.canvas.delete("triangle")
-        vertices = hsv_triangle_vertices(self.center, self.center, self.triangle_radius, self.hue)
-        steps = 28
-        for value_step in range(steps):
-            v0 = value_step / steps
-            v1 = (value_step + 1) / steps
-            for sat_step in range(steps):
-                s0 = sat_step / steps
-                s1 = (sat_step + 1) / steps
-                p00 = point_from_barycentric(vertices, weights_from_sv(s0, v0))
-                p10 = point_from_barycentric(vertices, weights_from_sv(s1, v0))
-                p11 = point_from_barycentric(vertices, weights_from_sv(s1, v1))
-                p01 = point_from_barycentric(vertices, weights_from_sv(s0, v1))
-                fill = _hsv_to_hex(self.hue, ((s0 + s1) / 2) * 100.0, ((v0 + v1) / 2) * 100.0)
-                self.canvas.create_polygon(
-                    p00[0],
-                    p00[1],
-                    p10[0],
-                    p10[1],
-                    p11[0],
-                    p11[1],
-                    p01[0],
-                    p01[1],
-                    outline="",
-                    fill=fill,
-                    tags="triangle",
+    def destroy(self) -> None:
+        for after_id in (self._job_after_id, self._resize_after_id):
+            if after_id is not None:
+                self.after_cancel(after_id)
+        self._job = None
+        super().destroy()
+
+    def _set_geometry(self, size: int) -> None:
+        self.size = size
+        self.center = size / 2
+        self.outer_radius = size * 0.45
+        self.ring_width = size * 0.11
+        self.inner_radius = self.outer_radius - self.ring_width
+        self.triangle_radius = self.inner_radius * 0.88
+        self.canvas.configure(width=size, height=size)
+
+    def _on_configure(self, event) -> None:
+        size = int(_clamp(event.width, self.min_size, self.MAX_SIZE))
+        if size == self._pending_size:
+            return
+        self._pending_size = size
+        if self._resize_after_id is not None:
+            self.after_cancel(self._resize_after_id)
+        self._resize_after_id = self.after(self.RESIZE_DEBOUNCE_MS, self._apply_resize)
+
+    def _apply_resize(self) -> None:
+        self._resize_after_id = None
+        if self._pending_size == self.size:
+            return
+        self._set_geometry(self._pending_size)
+        self._request_render()
+        self._draw_handles()
+
+    def _request_render(self) -> None:
+        if self._job_after_id is not None:
+            self.after_cancel(self._job_after_id)
+            self._job_after_id = None
+        hue_key = round(self.hue, 1)
+        pending = list(self.LEVEL_FACTORS)
+        for index in range(len(self.LEVEL_FACTORS) - 1, -1, -1):
+            key = (self.size, self.LEVEL_FACTORS[index], hue_key, self.simulation)
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self._show(image)
+                pending = pending[index + 1 :]
+                break
+        self._job = self._render_levels(pending, hue_key, self.simulation) if pending else None
+        self._pump_job()
+
+    def _pump_job(self) -> None:
+        self._job_after_id = None
+        if self._job is None:
+            return
+        try:
+            _run_slice(self._job, self.FRAME_BUDGET)
+        except StopIteration:
+            self._job = None
+            return
+        self._job_after_id = self.after(1, self._pump_job)
+
+    def _render_levels(self, factors: list[int], hue: float, mode: str):
+        size = self.size
+        for factor in factors:
+            level_size = -(-size // factor)
+            scale = 1.0 / factor
+            frame_key = (size, factor, hue)
+            frame = self._frames.get(frame_key)
+            if frame is None:
+                ring_key = (size, factor)
+                ring = self._ring_buffers.get(ring_key)
+                if ring is None:
+                    ring_rows = bytearray()
+                    for start in range(0, level_size, self.ROWS_PER_STEP):
+                        ring_rows += hue_ring_band(
+                            level_size,
+                            self.center * scale,
+                            self.inner_radius * scale,
+                            self.outer_radius * scale,
+                            self._background,
+                            start,
+                            min(level_size, start + self.ROWS_PER_STEP),
+                        )
+                        yield
+                    ring = bytes(ring_rows)
+                    _remember(self._ring_buffers, ring_key, ring, self.FRAME_CACHE_LIMIT)
+                pixels = bytearray(ring)
+                vertices = hsv_triangle_vertices(
+                    self.center * scale, self.center * scale, self.triangle_radius * scale, hue
                 )
+                top = max(0, math.floor(min(y for _, y in vertices)))
+                bottom = min(level_size, math.ceil(max(y for _, y in vertices)) + 1)
+                for start in range(top, bottom, self.ROWS_PER_STEP):
+                    paint_triangle_band(pixels, level_size, vertices, hue, start, start + self.ROWS_PER_STEP)
+                    yield
+                frame = bytes(pixels)
+                _remember(self._frames, frame_key, frame, self.FRAME_CACHE_LIMIT)
+            else:
+                self._frames.move_to_end(frame_key)
+
+            if mode != "normal":
+                # One row per step: simulating is far slower per pixel than painting.
+                stride = level_size * 3
+                simulated = bytearray()
+                for offset in range(0, len(frame), stride):
+                    simulated += simulate_cvd_pixels(frame[offset : offset + stride], mode)
+                    yield
+                frame = bytes(simulated)
+
+            header = f"P6\n{level_size} {level_size}\n255\n".encode("ascii")
+            image = tk.PhotoImage(master=self.canvas, data=header + frame, format="PPM")
+            if factor > 1:
+                image = image.zoom(factor)
+            _remember(self._images, (size, factor, hue, mode), image, self.IMAGE_CACHE_LIMIT)
+            self._show(image)
+            yield
+
+    def _show(self, image: tk.PhotoImage) -> None:
+        self._shown_image = image
+        self.canvas.itemconfigure(self._image_item, image=image)
+
+    def _draw_handles(self) -> None:
+        self.canvas.delete("handles")
+        vertices = hsv_triangle_vertices(self.center, self.center, self.triangle_radius, self.hue)
         self.canvas.create_polygon(
             vertices[0][0],
             vertices[0][1],
@@ -175,11 +1867,9 @@ class HsvWheel(ttk.Frame):
             outline="#111827",
             width=1,
             fill="",
-            tags="triangle",
+            tags="handles",
         )
 
-    def _draw_handles(self) -> None:
-        self.canvas.delete("handles")
         angle = math.radians(self.hue)
         ring_radius = self.inner_radius + self.ring_width / 2
         hx = self.center + math.cos(angle) * ring_radius
@@ -187,7 +1877,6 @@ class HsvWheel(ttk.Frame):
         self.canvas.create_oval(hx - 6, hy - 6, hx + 6, hy + 6, fill="", outline="#111827", width=2, tags="handles")
         self.canvas.create_oval(hx - 4, hy - 4, hx + 4, hy + 4, fill="", outline="white", width=1, tags="handles")
 
-        vertices = hsv_triangle_vertices(self.center, self.center, self.triangle_radius, self.hue)
         tx, ty = point_from_barycentric(vertices, weights_from_sv(self.saturation / 100.0, self.value / 100.0))
         self.canvas.create_oval(tx - 5, ty - 5, tx + 5, ty + 5, fill="", outline="#111827", width=2, tags="handles")
         self.canvas.create_oval(tx - 3, ty - 3, tx + 3, ty + 3, fill="", outline="white", width=1, tags="handles")
@@ -227,7 +1916,7 @@ class HsvWheel(ttk.Frame):
     def _update_hue_from_point(self, x: float, y: float) -> None:
         angle = math.degrees(math.atan2(y - self.center, x - self.center))
         self.hue = (angle + 360.0) % 360.0
-        self._draw_triangle()
+        self._request_render()
         self._draw_handles()
 
     def _update_sv_from_point(self, x: float, y: float) -> None:
@@ -243,11 +1932,522 @@ class HsvWheel(ttk.Frame):
         self.on_change(self.hue, self.saturation, self.value, commit)
 
 
+class ImageEyedropper(tk.Toplevel):
+    """Pan/zoom image viewer with a magnifier loupe; clicking samples a color.
+
+    Zoom steps are powers of two so every tile maps onto whole source pixels. Only
+    tiles intersecting the view are built, from a step generator pumped in
+    ``FRAME_BUDGET`` slices, and kept in an LRU cache keyed by zoom level and tile
+    position. Below 1:1 a point-sampled placeholder goes up first and is swapped for
+    the box-filtered :class:`MipPyramid` tile once that is built.
+    """
+
+    MIN_ZOOM_EXP = -12
+    MAX_ZOOM_EXP = 5
+    TILE_CACHE_LIMIT = 160
+    FRAME_BUDGET = 0.012
+    LOUPE_PIXELS = 15
+    LOUPE_SCALE = 10
+    SAMPLE_SIZES = ("1×1", "3×3", "5×5", "9×9", "15×15")
+    FILETYPES = [("Images", "*.png *.gif *.ppm *.pnm"), ("All files", "*.*")]
+
+    def __init__(self, master, on_pick) -> None:
+        super().__init__(master)
+        self.title("Image eyedropper")
+        self.geometry("900x640")
+        self.on_pick = on_pick
+        self.raster: MmapRaster | PhotoRaster | None = None
+        self.mips: MipPyramid | None = None
+        self.zoom_exp = 0
+        self.left = 0
+        self.top = 0
+        self._tiles: OrderedDict[tuple[int, int, int], tk.PhotoImage] = OrderedDict()
+        self._shown: dict[tuple[int, int], tuple[int, tk.PhotoImage]] = {}
+        self._pending: list[tuple[int, int]] = []
+        self._unfiltered: list[tuple[int, int]] = []
+        self._tile_job = None
+        self._pump_after_id: str | None = None
+        self._loupe_after_id: str | None = None
+        self._loupe_image: tk.PhotoImage | None = None
+        self._pointer: tuple[int, int] | None = None
+        self._drag_origin: tuple[int, int, int, int] | None = None
+        self._dragged = False
+
+        toolbar = ttk.Frame(self, padding=(10, 8))
+        toolbar.pack(fill="x")
+        ttk.Button(toolbar, text="Open image…", command=self.choose_image).pack(side="left")
+        ttk.Label(toolbar, text="Average:").pack(side="left", padx=(14, 4))
+        self.sample_var = tk.StringVar(value=self.SAMPLE_SIZES[0])
+        sample_combo = ttk.Combobox(
+            toolbar, textvariable=self.sample_var, values=self.SAMPLE_SIZES, state="readonly", width=6
+        )
+        sample_combo.pack(side="left")
+        sample_combo.bind("<<ComboboxSelected>>", lambda _: self._schedule_loupe())
+        self.info_var = tk.StringVar(value="Open a PNG, GIF or PPM image. Scroll to zoom, drag to pan, click to pick.")
+        ttk.Label(toolbar, textvariable=self.info_var, foreground="#6b7280").pack(side="left", padx=(14, 0))
+
+        body = ttk.Frame(self)
+        body.pack(fill="both", expand=True)
+        self.canvas = tk.Canvas(body, background="#2b2b2b", highlightthickness=0, bd=0, cursor="crosshair")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        loupe_size = self.LOUPE_PIXELS * self.LOUPE_SCALE
+        self.loupe = tk.Canvas(body, width=loupe_size, height=loupe_size, background="#2b2b2b", highlightthickness=0)
+        self.loupe.pack(side="top", padx=10, pady=10)
+        self._loupe_item = self.loupe.create_image(0, 0, anchor="nw")
+        self._loupe_box = self.loupe.create_rectangle(0, 0, 0, 0, outline="#ffffff")
+
+        self.canvas.bind("<Configure>", lambda _: self._redraw())
+        self.canvas.bind("<ButtonPress-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self._on_release)
+        self.canvas.bind("<Motion>", self._on_motion)
+        self.canvas.bind("<MouseWheel>", lambda event: self._zoom_at(event.x, event.y, 1 if event.delta > 0 else -1))
+        self.canvas.bind("<Button-4>", lambda event: self._zoom_at(event.x, event.y, 1))
+        self.canvas.bind("<Button-5>", lambda event: self._zoom_at(event.x, event.y, -1))
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    @property
+    def sample_size(self) -> int:
+        return int(self.sample_var.get().split("×")[0])
+
+    def choose_image(self) -> None:
+        path = filedialog.askopenfilename(parent=self, title="Open image", filetypes=self.FILETYPES)
+        if path:
+            self.open_image(path)
+
+    def open_image(self, path: str | Path) -> None:
+        try:
+            raster = open_raster(self, path)
+        except (OSError, ValueError, tk.TclError) as e:
+            messagebox.showerror("Image Error", f"Failed to open image: {e}", parent=self)
+            return
+        self._close_raster()
+        self.raster = raster
+        self.mips = MipPyramid(raster)
+        self.title(f"Image eyedropper — {Path(path).name}")
+        self.update_idletasks()
+        if self.canvas.winfo_ismapped():
+            view_width, view_height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        else:
+            view_width, view_height = self.canvas.winfo_reqwidth(), self.canvas.winfo_reqheight()
+        self.zoom_exp = fit_zoom_exp(raster.width, raster.height, view_width, view_height, self.MIN_ZOOM_EXP)
+        shown_width, shown_height = display_size(raster.width, raster.height, self.zoom_exp)
+        self.left = (shown_width - view_width) // 2
+        self.top = (shown_height - view_height) // 2
+        self._redraw()
+
+    def close(self) -> None:
+        self._close_raster()
+        self.destroy()
+
+    def _close_raster(self) -> None:
+        for after_id in (self._pump_after_id, self._loupe_after_id):
+            if after_id is not None:
+                self.after_cancel(after_id)
+        self._pump_after_id = self._loupe_after_id = None
+        self._clear_tiles()
+        self._tiles.clear()
+        self._loupe_image = None
+        self.loupe.itemconfigure(self._loupe_item, image="")
+        if self.raster is not None:
+            self.raster.close()
+            self.raster = self.mips = None
+
+    def _clear_tiles(self) -> None:
+        for item, _ in self._shown.values():
+            self.canvas.delete(item)
+        self._shown.clear()
+        self._pending = []
+        self._unfiltered = []
+        if self._pump_after_id is not None:
+            self.after_cancel(self._pump_after_id)
+        self._pump_after_id = self._tile_job = None
+
+    def _image_point(self, x: int, y: int) -> tuple[int, int]:
+        """Source pixel under a canvas position (may lie outside the image)."""
+        if self.zoom_exp < 0:
+            return (self.left + x) << -self.zoom_exp, (self.top + y) << -self.zoom_exp
+        return (self.left + x) >> self.zoom_exp, (self.top + y) >> self.zoom_exp
+
+    def _redraw(self) -> None:
+        if self.raster is None:
+            return
+        view_width, view_height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        shown_width, shown_height = display_size(self.raster.width, self.raster.height, self.zoom_exp)
+        self.left = int(_clamp(self.left, -view_width // 2, shown_width - view_width // 2))
+        self.top = int(_clamp(self.top, -view_height // 2, shown_height - view_height // 2))
+        wanted = visible_tiles(self.left, self.top, view_width, view_height, shown_width, shown_height)
+        wanted_set = set(wanted)
+        for key in [key for key in self._shown if key not in wanted_set]:
+            self.canvas.delete(self._shown.pop(key)[0])
+        for tile_x, tile_y in wanted:
+            if (tile_x, tile_y) in self._shown:
+                self.canvas.coords(
+                    self._shown[tile_x, tile_y][0], tile_x * IMAGE_TILE - self.left, tile_y * IMAGE_TILE - self.top
+                )
+        self._pending = [key for key in wanted if key not in self._shown]
+        if self._pending and self._tile_job is None:
+            self._tile_job = self._tile_steps()
+            self._pump_tiles()
+        note = self.raster.NOTE
+        self.info_var.set(
+            f"{self.raster.width}×{self.raster.height}px at {2.0 ** self.zoom_exp:g}× — "
+            + (f"{note}; " if note else "")
+            + "scroll to zoom, drag to pan, click to pick"
+        )
+
+    def _pump_tiles(self) -> None:
+        self._pump_after_id = None
+        try:
+            _run_slice(self._tile_job, self.FRAME_BUDGET)
+        except StopIteration:
+            self._tile_job = None
+            return
+        self._pump_after_id = self.after(1, self._pump_tiles)
+
+    def _tile_steps(self):
+        """Place pending tiles, then replace point-sampled placeholders with filtered ones."""
+        while self._pending or self._unfiltered:
+            if self._pending:
+                tile_x, tile_y = self._pending.pop(0)
+                key = (self.zoom_exp, tile_x, tile_y)
+                image = self._tiles.get(key)
+                if image is not None:
+                    self._tiles.move_to_end(key)
+                else:
+                    x0, y0, x1, y1, step = tile_source_box(
+                        tile_x, tile_y, self.zoom_exp, self.raster.width, self.raster.height
+                    )
+                    image = self.raster.photo(self.canvas, x0, y0, x1, y1, step)
+                    if self.zoom_exp > 0:
+                        image = image.zoom(1 << self.zoom_exp)
+                    if self.zoom_exp < 0:
+                        self._unfiltered.append((tile_x, tile_y))
+                    else:
+                        _remember(self._tiles, key, image, self.TILE_CACHE_LIMIT)
+                item = self.canvas.create_image(
+                    tile_x * IMAGE_TILE - self.left, tile_y * IMAGE_TILE - self.top, anchor="nw", image=image
+                )
+                self.canvas.tag_lower(item)
+                self._shown[tile_x, tile_y] = (item, image)
+            else:
+                tile_x, tile_y = self._unfiltered.pop(0)
+                if (tile_x, tile_y) not in self._shown:
+                    continue
+                pixels, width, height = yield from self.mips.tile_steps(-self.zoom_exp, tile_x, tile_y)
+                image = _ppm_photo(self.canvas, pixels, width, height)
+                _remember(self._tiles, (self.zoom_exp, tile_x, tile_y), image, self.TILE_CACHE_LIMIT)
+                shown = self._shown.get((tile_x, tile_y))
+                if shown is not None:
+                    self.canvas.itemconfigure(shown[0], image=image)
+                    self._shown[tile_x, tile_y] = (shown[0], image)
+            yield
+
+    def _zoom_at(self, x: int, y: int, direction: int) -> None:
+        if self.raster is None:
+            return
+        zoom_exp = int(_clamp(self.zoom_exp + direction, self.MIN_ZOOM_EXP, self.MAX_ZOOM_EXP))
+        if zoom_exp == self.zoom_exp:
+            return
+        # Keep the display point under the cursor fixed while the scale doubles or halves.
+        factor = 2.0 ** (zoom_exp - self.zoom_exp)
+        self.left = int((self.left + x) * factor) - x
+        self.top = int((self.top + y) * factor) - y
+        self.zoom_exp = zoom_exp
+        self._clear_tiles()
+        self._redraw()
+        self._schedule_loupe()
+
+    def _on_press(self, event) -> None:
+        self._drag_origin = (event.x, event.y, self.left, self.top)
+        self._dragged = False
+
+    def _on_drag(self, event) -> None:
+        if self._drag_origin is None:
+            return
+        x, y, left, top = self._drag_origin
+        if abs(event.x - x) + abs(event.y - y) > 3:
+            self._dragged = True
+        if self._dragged:
+            self.left, self.top = left - (event.x - x), top - (event.y - y)
+            self._redraw()
+
+    def _on_release(self, event) -> None:
+        self._drag_origin = None
+        if self._dragged or self.raster is None:
+            return
+        color = self._sample(*self._image_point(event.x, event.y))
+        if color is not None:
+            self.on_pick(color)
+
+    def _sample(self, x: int, y: int) -> str | None:
+        if not (0 <= x < self.raster.width and 0 <= y < self.raster.height):
+            return None
+        box = sample_box(x, y, self.sample_size, self.raster.width, self.raster.height)
+        return _rgb_to_hex(average_rgb(self.raster.region(*box)))
+
+    def _on_motion(self, event) -> None:
+        self._pointer = (event.x, event.y)
+        self._schedule_loupe()
+
+    def _schedule_loupe(self) -> None:
+        if self._loupe_after_id is None:
+            self._loupe_after_id = self.after_idle(self._update_loupe)
+
+    def _update_loupe(self) -> None:
+        self._loupe_after_id = None
+        if self.raster is None or self._pointer is None:
+            return
+        x, y = self._image_point(*self._pointer)
+        color = self._sample(x, y)
+        if color is None:
+            self.loupe.itemconfigure(self._loupe_item, image="")
+            self.loupe.coords(self._loupe_box, 0, 0, 0, 0)
+            return
+        x0, y0, x1, y1 = sample_box(x, y, self.LOUPE_PIXELS, self.raster.width, self.raster.height)
+        self._loupe_image = self.raster.photo(self.loupe, x0, y0, x1, y1).zoom(self.LOUPE_SCALE)
+        half = self.LOUPE_PIXELS // 2
+        self.loupe.itemconfigure(self._loupe_item, image=self._loupe_image)
+        self.loupe.coords(self._loupe_item, (x0 - x + half) * self.LOUPE_SCALE, (y0 - y + half) * self.LOUPE_SCALE)
+        box = sample_box(half, half, self.sample_size, self.LOUPE_PIXELS, self.LOUPE_PIXELS)
+        self.loupe.coords(self._loupe_box, *(coordinate * self.LOUPE_SCALE for coordinate in box))
+        outline = "#000000" if relative_luminance(_hex_to_rgb(color)) > 0.5 else "#ffffff"
+        self.loupe.itemconfigure(self._loupe_box, outline=outline)
+        self.info_var.set(f"({x}, {y})  {color}  at {2.0 ** self.zoom_exp:g}×")
+
+
+@contextlib.contextmanager
+def _file_lock(path: Path):
+    """Hold an exclusive advisory lock on ``path`` (created if missing) across processes."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+class FavoritesJournal:
+    """Append-only operation log shared by every window or process editing one favorites store.
+
+    Each line is a JSON object ``{"op": "add" | "remove" | "reset", "colors": [...], "origin": ...}``.
+    Writers append whole lines while holding an advisory lock on a sidecar ``.lock``
+    file, so lines never interleave or overwrite each other, even where ``O_APPEND``
+    is only emulated (Windows). Every instance folds the same log in file order,
+    which makes the merged favorites identical everywhere; readers take no lock,
+    remember their byte offset and only parse lines appended since the last poll.
+    Once the log grows past ``COMPACT_BYTES`` a writer replaces it, under the same
+    lock, with a single ``reset`` entry; other readers notice the new inode and
+    re-read it from the start.
+    """
+
+    COMPACT_BYTES = 256 * 1024
+
+    def __init__(self, path: Path, origin: str | None = None) -> None:
+        self.path = path
+        self.lock_path = path.with_name(path.name + ".lock")
+        self.origin = origin or f"{os.getpid()}-{random.getrandbits(32):08x}"
+        self.offset = 0
+        self._signature: tuple[int, int, int] | None = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _line(self, op: str, colors: list[str]) -> bytes:
+        return (json.dumps({"op": op, "colors": colors, "origin": self.origin}, separators=(",", ":")) + "\n").encode(
+            "utf-8"
+        )
+
+    def append(self, op: str, colors: list[str]) -> None:
+        line = self._line(op, colors)
+        with _file_lock(self.lock_path):
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+    def compact(self, favorites: list[str]) -> bool:
+        """Atomically rewrite an oversized log as one ``reset`` to ``favorites``.
+
+        ``favorites`` must be the fold of everything read so far. The rewrite is
+        skipped when the log is still small or another writer appended entries this
+        reader has not folded yet; the next call tries again. The check and the
+        replace both happen under the writers' lock, so no append can land in the
+        file being replaced.
+        """
+        if self.offset < self.COMPACT_BYTES:
+            return False
+        line = self._line("reset", favorites)
+        temporary = self.path.with_name(f"{self.path.name}.{self.origin}.tmp")
+        try:
+            with open(temporary, "wb") as file:
+                file.write(line)
+            with _file_lock(self.lock_path):
+                stat = self.path.stat()
+                if self._signature is None or (stat.st_size, stat.st_ino) != (self.offset, self._signature[2]):
+                    return False
+                os.replace(temporary, self.path)
+                stat = self.path.stat()
+        except OSError:
+            return False
+        finally:
+            if temporary.exists():
+                temporary.unlink()
+        self.offset = len(line)
+        self._signature = (self.offset, stat.st_mtime_ns, stat.st_ino)
+        return True
+
+    def changed(self) -> bool:
+        """Cheap poll: compare the file's size, mtime and inode with the last read."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns, stat.st_ino) != self._signature
+
+    def read_new(self) -> list[dict]:
+        """Return complete entries appended since the previous call (all of them after a rewrite)."""
+        try:
+            with open(self.path, "rb") as file:
+                stat = os.fstat(file.fileno())
+                if self._signature is not None and (stat.st_ino != self._signature[2] or stat.st_size < self.offset):
+                    self.offset = 0
+                file.seek(self.offset)
+                data = file.read()
+        except FileNotFoundError:
+            return []
+        end = data.rfind(b"\n") + 1
+        self.offset += end
+        self._signature = (self.offset, stat.st_mtime_ns, stat.st_ino) if end == len(data) else None
+        entries = []
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and entry.get("op") in ("add", "remove", "reset"):
+                entries.append(entry)
+        return entries
+
+
+def apply_journal_ops(favorites: list[str], entries: list[dict]) -> list[tuple[str, str | None]]:
+    """Fold journal entries into ``favorites`` in place and return the resulting changes.
+
+    Adds of present colors and removes of absent ones are no-ops, so replaying an
+    entry twice is harmless. Changes are ``("add", color)``, ``("remove", color)`` or
+    ``("reset", None)`` and let callers update widgets incrementally.
+    """
+    changes: list[tuple[str, str | None]] = []
+    present = set(favorites)
+    for entry in entries:
+        colors = sanitize_palette(entry.get("colors") or [])
+        if entry["op"] == "reset":
+            favorites[:] = colors
+            present = set(colors)
+            changes = [("reset", None)]
+        elif entry["op"] == "add":
+            for color in colors:
+                if color not in present:
+                    present.add(color)
+                    favorites.append(color)
+                    changes.append(("add", color))
+        else:
+            for color in colors:
+                if color in present:
+                    present.discard(color)
+                    favorites.remove(color)
+                    changes.append(("remove", color))
+    return changes
+
+
+class Workspace:
+    """A named palette: its colors plus the panel, swatches and search index built for it.
+
+    Workspaces start unloaded; the app builds the panel and reads the store the first
+    time one is opened and keeps it around, so switching back only swaps frames.
+    """
+
+    def __init__(self, name: str, path: Path) -> None:
+        self.name = name
+        self.path = path
+        self.journal = FavoritesJournal(path.with_name(path.name + ".journal"))
+        self.favorites: list[str] = []
+        self.history: list[str] = []
+        self.cvd_mode = "normal"
+        self.panel: ttk.Frame | None = None
+        self.history_swatches: ttk.Frame | None = None
+        self.history_list: tk.Listbox | None = None
+        self.history_filter: PaletteListFilter | None = None
+        self.favorites_swatches: ttk.Frame | None = None
+        self.favorites_list: tk.Listbox | None = None
+        self.favorites_filter: PaletteListFilter | None = None
+        self.save_after_id: str | None = None
+
+    def read_store(self, history_limit: int) -> None:
+        """Load favorites and history from the store, then fold in the favorites journal.
+
+        Stores are ``{"favorites": [...], "history": [...]}``; a bare list is the older
+        favorites-only format of the default workspace and is still accepted.
+        """
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                payload = json.load(f)
+            if isinstance(payload, dict):
+                self.favorites = sanitize_palette(payload.get("favorites", []))
+                self.history = sanitize_palette(payload.get("history", []), history_limit)
+            else:
+                self.favorites = sanitize_palette(payload)
+        if self.journal.exists():
+            self.favorites = []
+            apply_journal_ops(self.favorites, self.journal.read_new())
+        else:
+            self.journal.append("reset", self.favorites)
+            self.journal.read_new()
+
+    def write_store(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({"favorites": self.favorites, "history": self.history}, f, indent=2)
+
+
+def _workspace_attribute(name: str) -> property:
+    return property(
+        lambda self: getattr(self.workspace, name),
+        lambda self, value: setattr(self.workspace, name, value),
+    )
+
+
 class ColorPickerApp:
     """Enhanced color picker helper with history, copying, and live preview."""
 
     HISTORY_LIMIT = 10
     FAVORITES_FILE = Path.home() / ".color_picker_favorites.json"
+    WORKSPACES_DIR = Path.home() / ".color_picker_workspaces"
+    DEFAULT_WORKSPACE = "Default"
+    WORKSPACE_CACHE_LIMIT = 4
+    SYNC_INTERVAL_MS = 1000
+    HISTORY_SAVE_DELAY_MS = 1000
+    PALETTE_FILETYPES = [("JSON files", "*.json"), ("Binary palettes", "*.cpal")]
+
+    favorites = _workspace_attribute("favorites")
+    history = _workspace_attribute("history")
+    favorites_list = _workspace_attribute("favorites_list")
+    history_list = _workspace_attribute("history_list")
+    favorites_filter = _workspace_attribute("favorites_filter")
+    history_filter = _workspace_attribute("history_filter")
+    favorites_swatches = _workspace_attribute("favorites_swatches")
+    history_swatches = _workspace_attribute("history_swatches")
 
     def __init__(self, root: tk.Tk) -> None:
         self.root = root
@@ -258,19 +2458,23 @@ class ColorPickerApp:
 
         self._status_after_id: str | None = None
         self.current_color = {"hex": "#3498DB", "rgb": (52, 152, 219)}
-        self.history: list[str] = []
-        self.favorites: list[str] = []
+        self.workspace: Workspace | None = None
+        self._loaded_workspaces: OrderedDict[str, Workspace] = OrderedDict()
         self.custom_background = "#1F2937"
+        self.cvd_mode = "normal"
         self._updating_hsv_controls = False
+        self._eyedropper: ImageEyedropper | None = None
 
         self.hue_var = tk.IntVar(value=210)
         self.sat_var = tk.IntVar(value=76)
         self.val_var = tk.IntVar(value=86)
 
         self._build_ui()
-        self._load_favorites()
+        self.open_workspace(self.DEFAULT_WORKSPACE)
+        self._sync_after_id = self.root.after(self.SYNC_INTERVAL_MS, self._poll_favorites_store)
         self.set_color(self.current_color["hex"], add_to_history=False)
         self._set_status("Pick a color to get started.")
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _build_ui(self) -> None:
         style = tb.Style(theme="flatly")
@@ -313,6 +2517,18 @@ class ColorPickerApp:
         )
         header_actions = ttk.Frame(header_frame)
         header_actions.grid(row=0, column=1, sticky="e")
+        self.workspace_var = tk.StringVar(value=self.DEFAULT_WORKSPACE)
+        self.workspace_combo = ttk.Combobox(
+            header_actions,
+            textvariable=self.workspace_var,
+            values=self._discover_workspaces(),
+            state="readonly",
+            width=14,
+        )
+        self.workspace_combo.pack(side="left", padx=(0, 4))
+        self.workspace_combo.bind("<<ComboboxSelected>>", lambda _: self.open_workspace(self.workspace_var.get()))
+        ttk.Button(header_actions, text="New…", command=self.new_workspace).pack(side="left", padx=(0, 12))
+        ttk.Button(header_actions, text="Image…", command=self.open_image_eyedropper).pack(side="left", padx=(0, 12))
         ttk.Button(header_actions, text="Export JSON", command=self.export_palette).pack(side="left", padx=(0, 8))
         ttk.Button(header_actions, text="Import JSON", command=self.import_palette).pack(side="left")
 
@@ -326,6 +2542,20 @@ class ColorPickerApp:
         )
         self.preview.pack()
 
+        simulation_row = ttk.Frame(preview_frame)
+        simulation_row.pack(pady=(10, 0))
+        ttk.Label(simulation_row, text="Simulate vision:").pack(side="left", padx=(0, 8))
+        self.cvd_mode_var = tk.StringVar(value=self.cvd_mode.capitalize())
+        cvd_combo = ttk.Combobox(
+            simulation_row,
+            textvariable=self.cvd_mode_var,
+            values=[mode.capitalize() for mode in CVD_MODES],
+            state="readonly",
+            width=15,
+        )
+        cvd_combo.pack(side="left")
+        cvd_combo.bind("<<ComboboxSelected>>", self._on_cvd_mode_change)
+
         info_frame = ttk.LabelFrame(self.main_frame, text="Color values", padding=15)
         info_frame.grid(row=2, column=0, sticky="ew", pady=(12, 0))
         info_frame.columnconfigure(0, weight=1)
@@ -381,7 +2611,7 @@ class ColorPickerApp:
         wheel_frame = ttk.LabelFrame(self.main_frame, text="Color wheel", padding=15)
         wheel_frame.grid(row=4, column=0, sticky="ew", pady=(16, 0))
         self.hsv_wheel = HsvWheel(wheel_frame, on_change=self._on_wheel_change, size=240)
-        self.hsv_wheel.pack()
+        self.hsv_wheel.pack(fill="x")
 
         slider_frame = ttk.LabelFrame(self.main_frame, text="HSV sliders", padding=15)
         slider_frame.grid(row=5, column=0, sticky="ew", pady=(16, 0))
@@ -444,23 +2674,92 @@ class ColorPickerApp:
         self.custom_bg_swatch.create_rectangle(1, 1, 22, 16, fill=self.custom_background, outline="")
         ttk.Button(custom_row, text="Pick background", command=self.pick_custom_background).pack(side="left")
 
-        history_frame = ttk.LabelFrame(self.main_frame, text="Recent colors (double-click to reuse)", padding=15)
-        history_frame.grid(row=8, column=0, sticky="nsew", pady=(16, 0))
+        gradient_frame = ttk.LabelFrame(self.main_frame, text="Gradients and tints", padding=15)
+        gradient_frame.grid(row=8, column=0, sticky="ew", pady=(16, 0))
+        gradient_frame.columnconfigure(0, weight=1)
+
+        gradient_options = ttk.Frame(gradient_frame)
+        gradient_options.grid(row=0, column=0, sticky="ew")
+        self.ramp_kind_var = tk.StringVar(value="Gradient to")
+        kind_combo = ttk.Combobox(
+            gradient_options,
+            textvariable=self.ramp_kind_var,
+            values=["Gradient to", "Tints & shades"],
+            state="readonly",
+            width=13,
+        )
+        kind_combo.pack(side="left")
+        self.ramp_end_var = tk.StringVar(value="#FFFFFF")
+        ttk.Entry(gradient_options, textvariable=self.ramp_end_var, font=("Consolas", 11), width=9).pack(
+            side="left", padx=(6, 12)
+        )
+        ttk.Label(gradient_options, text="Space:").pack(side="left")
+        self.ramp_space_var = tk.StringVar(value="OKLab")
+        space_combo = ttk.Combobox(
+            gradient_options,
+            textvariable=self.ramp_space_var,
+            values=["OKLab", "OKLCH", "HSV"],
+            state="readonly",
+            width=7,
+        )
+        space_combo.pack(side="left", padx=(4, 12))
+        ttk.Label(gradient_options, text="Steps:").pack(side="left")
+        self.ramp_steps_var = tk.StringVar(value="9")
+        ttk.Spinbox(gradient_options, from_=2, to=4096, textvariable=self.ramp_steps_var, width=6).pack(
+            side="left", padx=(4, 0)
+        )
+        for combo in (kind_combo, space_combo):
+            combo.bind("<<ComboboxSelected>>", lambda _: self._schedule_ramp_update())
+        for variable in (self.ramp_end_var, self.ramp_steps_var):
+            variable.trace_add("write", lambda *_: self._schedule_ramp_update())
+
+        self.ramp_canvas = tk.Canvas(gradient_frame, height=36, highlightthickness=0, bd=0, cursor="crosshair")
+        self.ramp_canvas.grid(row=1, column=0, sticky="ew", pady=(10, 8))
+        self._ramp_image_item = self.ramp_canvas.create_image(0, 0, anchor="nw")
+        self._ramp_image: tk.PhotoImage | None = None
+        self._ramp_colors: list[str] = []
+        self._ramp_after_id: str | None = None
+        self.ramp_canvas.bind("<Configure>", lambda _: self._schedule_ramp_update())
+        self.ramp_canvas.bind("<Button-1>", self._on_ramp_click)
+
+        ramp_actions = ttk.Frame(gradient_frame)
+        ramp_actions.grid(row=2, column=0, sticky="w")
+        ttk.Button(ramp_actions, text="Export ramp", command=self.export_ramp).pack(side="left")
+        self.ramp_info_var = tk.StringVar(value="")
+        ttk.Label(ramp_actions, textvariable=self.ramp_info_var, foreground="#6b7280").pack(side="left", padx=(10, 0))
+
+        status_frame = ttk.Frame(self.main_frame, padding=(0, 8, 0, 0))
+        status_frame.grid(row=10, column=0, sticky="ew")
+        self.status_var = tk.StringVar(value="Ready.")
+        ttk.Label(status_frame, textvariable=self.status_var, font=("Segoe UI", 10), foreground="#555555").grid(
+            row=0, column=0, sticky="w"
+        )
+
+    def _build_workspace_panel(self, workspace: Workspace) -> None:
+        workspace.panel = ttk.Frame(self.main_frame)
+        workspace.panel.columnconfigure(0, weight=1)
+
+        history_frame = ttk.LabelFrame(workspace.panel, text="Recent colors (double-click to reuse)", padding=15)
+        history_frame.grid(row=0, column=0, sticky="nsew", pady=(16, 0))
         history_frame.columnconfigure(0, weight=1)
-        history_frame.rowconfigure(1, weight=1)
+        history_frame.rowconfigure(2, weight=1)
 
-        self.history_swatches = ttk.Frame(history_frame)
-        self.history_swatches.grid(row=0, column=0, sticky="ew", columnspan=2, pady=(0, 10))
+        workspace.history_swatches = ttk.Frame(history_frame)
+        workspace.history_swatches.grid(row=0, column=0, sticky="ew", columnspan=2, pady=(0, 10))
 
-        self.history_list = tk.Listbox(history_frame, height=6, activestyle="none", font=("Consolas", 12))
-        self.history_list.grid(row=1, column=0, sticky="nsew")
-        scrollbar = ttk.Scrollbar(history_frame, orient="vertical", command=self.history_list.yview)
-        scrollbar.grid(row=1, column=1, sticky="nsw", padx=(6, 0))
-        self.history_list.configure(yscrollcommand=scrollbar.set)
-        self.history_list.bind("<Double-Button-1>", self.on_history_select)
+        history_filter_row = ttk.Frame(history_frame)
+        history_filter_row.grid(row=1, column=0, sticky="ew", pady=(0, 8), columnspan=2)
 
-        favorites_frame = ttk.LabelFrame(self.main_frame, text="Favorite colors (double-click to reuse)", padding=15)
-        favorites_frame.grid(row=9, column=0, sticky="nsew", pady=(16, 0))
+        workspace.history_list = tk.Listbox(history_frame, height=6, activestyle="none", font=("Consolas", 12))
+        workspace.history_list.grid(row=2, column=0, sticky="nsew")
+        scrollbar = ttk.Scrollbar(history_frame, orient="vertical")
+        scrollbar.grid(row=2, column=1, sticky="nsw", padx=(6, 0))
+        workspace.history_list.bind("<Double-Button-1>", self.on_history_select)
+        workspace.history_filter = PaletteListFilter(workspace.history_list, scrollbar)
+        self._build_filter_entry(history_filter_row, workspace.history_filter)
+
+        favorites_frame = ttk.LabelFrame(workspace.panel, text="Favorite colors (double-click to reuse)", padding=15)
+        favorites_frame.grid(row=1, column=0, sticky="nsew", pady=(16, 0))
         favorites_frame.columnconfigure(0, weight=1)
         favorites_frame.rowconfigure(2, weight=1)
 
@@ -468,22 +2767,23 @@ class ColorPickerApp:
         fav_buttons_frame.grid(row=0, column=0, sticky="ew", pady=(0, 8), columnspan=2)
         ttk.Button(fav_buttons_frame, text="Remove Selected", command=self.remove_favorite).pack(side="left")
 
-        self.favorites_swatches = ttk.Frame(favorites_frame)
-        self.favorites_swatches.grid(row=1, column=0, sticky="ew", columnspan=2, pady=(0, 10))
+        workspace.favorites_swatches = ttk.Frame(favorites_frame)
+        workspace.favorites_swatches.grid(row=1, column=0, sticky="ew", columnspan=2, pady=(0, 10))
 
-        self.favorites_list = tk.Listbox(favorites_frame, height=6, activestyle="none", font=("Consolas", 12))
-        self.favorites_list.grid(row=2, column=0, sticky="nsew")
-        fav_scrollbar = ttk.Scrollbar(favorites_frame, orient="vertical", command=self.favorites_list.yview)
+        workspace.favorites_list = tk.Listbox(favorites_frame, height=6, activestyle="none", font=("Consolas", 12))
+        workspace.favorites_list.grid(row=2, column=0, sticky="nsew")
+        fav_scrollbar = ttk.Scrollbar(favorites_frame, orient="vertical")
         fav_scrollbar.grid(row=2, column=1, sticky="nsw", padx=(6, 0))
-        self.favorites_list.configure(yscrollcommand=fav_scrollbar.set)
-        self.favorites_list.bind("<Double-Button-1>", self.on_favorite_select)
+        workspace.favorites_list.bind("<Double-Button-1>", self.on_favorite_select)
+        workspace.favorites_filter = PaletteListFilter(workspace.favorites_list, fav_scrollbar)
+        self._build_filter_entry(fav_buttons_frame, workspace.favorites_filter)
 
-        status_frame = ttk.Frame(self.main_frame, padding=(0, 8, 0, 0))
-        status_frame.grid(row=10, column=0, sticky="ew")
-        self.status_var = tk.StringVar(value="Ready.")
-        ttk.Label(status_frame, textvariable=self.status_var, font=("Segoe UI", 10), foreground="#555555").grid(
-            row=0, column=0, sticky="w"
-        )
+    def _build_filter_entry(self, parent: ttk.Frame, list_filter: PaletteListFilter) -> None:
+        query_var = tk.StringVar()
+        entry = ttk.Entry(parent, textvariable=query_var, font=("Consolas", 11), width=24)
+        entry.pack(side="right")
+        ttk.Label(parent, text="Filter (#3A, h:200-240, l:30-60, near:#336699):").pack(side="right", padx=(8, 6))
+        query_var.trace_add("write", lambda *_: list_filter.set_query(query_var.get()))
 
     def pick_color(self) -> None:
         try:
@@ -525,13 +2825,14 @@ class ColorPickerApp:
             self.current_color = {"hex": hex_value, "rgb": rgb}
             self.hex_entry_var.set(hex_value)
 
-            self.preview.itemconfig(self.preview_rect, fill=hex_value)
+            self.preview.itemconfig(self.preview_rect, fill=self._display_color(hex_value))
             self.hex_display.set(f"HEX: {hex_value}")
             self.rgb_display.set(f"RGB: {self._format_rgb(rgb)}")
             self.hsl_display.set(f"HSL: {self._format_hsl(rgb)}")
             self.hsv_display.set(f"HSV: {self._format_hsv(rgb)}")
             self._sync_hsv_controls_from_rgb(rgb)
             self._update_contrast()
+            self._schedule_ramp_update()
 
             if add_to_history:
                 self._update_history(hex_value)
@@ -544,12 +2845,27 @@ class ColorPickerApp:
         if hex_value in self.history:
             self.history.remove(hex_value)
         self.history.insert(0, hex_value)
+        for dropped in self.history[self.HISTORY_LIMIT :]:
+            self.history_filter.remove(dropped)
         self.history = self.history[: self.HISTORY_LIMIT]
 
-        self.history_list.delete(0, tk.END)
-        for color in self.history:
-            self.history_list.insert(tk.END, color)
+        self.history_filter.prepend(hex_value)
         self._render_swatches(self.history_swatches, self.history, self.set_color)
+        self._schedule_history_save()
+
+    def _schedule_history_save(self) -> None:
+        """History changes on every pick, so its saves are coalesced rather than written each time."""
+        workspace = self.workspace
+        if workspace.save_after_id is None:
+            workspace.save_after_id = self.root.after(
+                self.HISTORY_SAVE_DELAY_MS, lambda: self._save_favorites(workspace)
+            )
+
+    def _on_close(self) -> None:
+        for workspace in self._loaded_workspaces.values():
+            if workspace.save_after_id is not None:
+                self._save_favorites(workspace)
+        self.root.destroy()
 
     def on_history_select(self, event) -> None:
         selection = self.history_list.curselection()
@@ -576,7 +2892,7 @@ class ColorPickerApp:
         return f"{int(round(h * 360))}°, {int(round(s * 100))}%, {int(round(l * 100))}%"
 
     def _hex_to_rgb(self, hex_value: str) -> tuple[int, int, int]:
-        return (int(hex_value[1:3], 16), int(hex_value[3:5], 16), int(hex_value[5:7], 16))
+        return _hex_to_rgb(hex_value)
 
     def _format_hsv(self, rgb: tuple[int, int, int]) -> str:
         r, g, b = (channel / 255 for channel in rgb)
@@ -602,10 +2918,7 @@ class ColorPickerApp:
             self._set_status(f"{hex_value} is already in favorites.", duration=2000)
             return
         
-        self.favorites.append(hex_value)
-        self.favorites_list.insert(tk.END, hex_value)
-        self._render_swatches(self.favorites_swatches, self.favorites, self.set_color)
-        self._save_favorites()
+        self._record_favorites("add", [hex_value])
         self._set_status(f"{hex_value} added to favorites.", duration=2000)
 
     def remove_favorite(self) -> None:
@@ -615,12 +2928,8 @@ class ColorPickerApp:
             messagebox.showinfo("No selection", "Please select a favorite color to remove.")
             return
         
-        index = selection[0]
-        hex_value = self.favorites_list.get(index)
-        self.favorites_list.delete(index)
-        self.favorites.remove(hex_value)
-        self._render_swatches(self.favorites_swatches, self.favorites, self.set_color)
-        self._save_favorites()
+        hex_value = self.favorites_list.get(selection[0])
+        self._record_favorites("remove", [hex_value])
         self._set_status(f"{hex_value} removed from favorites.", duration=2000)
 
     def on_favorite_select(self, event) -> None:
@@ -631,38 +2940,152 @@ class ColorPickerApp:
         hex_value = self.favorites_list.get(selection[0])
         self.set_color(hex_value)
 
-    def _save_favorites(self) -> None:
-        """Save favorites to JSON file."""
+    def _save_favorites(self, workspace: Workspace | None = None) -> None:
+        """Save a workspace's favorites and history (the current workspace by default)."""
+        workspace = workspace or self.workspace
+        if workspace.save_after_id is not None:
+            self.root.after_cancel(workspace.save_after_id)
+            workspace.save_after_id = None
         try:
-            with open(self.FAVORITES_FILE, "w") as f:
-                json.dump(self.favorites, f, indent=2)
+            workspace.write_store()
         except Exception as e:
             messagebox.showerror("Save Error", f"Failed to save favorites: {e}")
 
     def _load_favorites(self) -> None:
-        """Load favorites from JSON file."""
+        """Load the current workspace from its JSON file."""
         try:
-            if self.FAVORITES_FILE.exists():
-                with open(self.FAVORITES_FILE, "r") as f:
-                    self.favorites = json.load(f)
-                    for color in self.favorites:
-                        self.favorites_list.insert(tk.END, color)
-                self._render_swatches(self.favorites_swatches, self.favorites, self.set_color)
-                self._set_status(f"Loaded {len(self.favorites)} favorite colors.", duration=2000)
+            self.workspace.read_store(self.HISTORY_LIMIT)
+            self._set_status(f"Loaded {len(self.favorites)} favorite colors.", duration=2000)
         except Exception as e:
             messagebox.showwarning("Load Error", f"Failed to load favorites: {e}")
             self.favorites = []
+        self.favorites_filter.reset(self.favorites)
+        self.history_filter.reset(self.history)
+        self._render_swatches(self.favorites_swatches, self.favorites, self.set_color)
+        self._render_swatches(self.history_swatches, self.history, self.set_color)
+
+    def _record_favorites(self, op: str, colors: list[str]) -> None:
+        """Append a favorites change to the shared journal, then apply the journal to this window."""
+        try:
+            self.workspace.journal.append(op, colors)
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Failed to save favorites: {e}")
+            return
+        self._sync_favorites()
+        self.workspace.journal.compact(self.favorites)
+        self._save_favorites()
+
+    def _sync_favorites(self) -> int:
+        """Apply journal entries appended since the last poll; returns how many came from elsewhere."""
+        journal = self.workspace.journal
+        if not journal.changed():
+            return 0
+        entries = journal.read_new()
+        changes = apply_journal_ops(self.favorites, entries)
+        for kind, color in changes:
+            if kind == "reset":
+                self.favorites_filter.reset(self.favorites)
+            elif kind == "add":
+                self.favorites_filter.append(color)
+            else:
+                self.favorites_filter.remove(color)
+        if changes:
             self._render_swatches(self.favorites_swatches, self.favorites, self.set_color)
+        return sum(1 for entry in entries if entry.get("origin") != journal.origin)
+
+    def _poll_favorites_store(self) -> None:
+        try:
+            remote = self._sync_favorites()
+        except Exception as e:
+            remote = 0
+            self._set_status(f"Error syncing favorites: {e}", duration=3000)
+        if remote:
+            self._set_status(f"Synced {remote} favorites change(s) from another window.", duration=2000)
+        self._sync_after_id = self.root.after(self.SYNC_INTERVAL_MS, self._poll_favorites_store)
+
+    def _discover_workspaces(self) -> list[str]:
+        names = {self.DEFAULT_WORKSPACE}
+        if self.WORKSPACES_DIR.is_dir():
+            names.update(path.stem for path in self.WORKSPACES_DIR.glob("*.json"))
+        return sorted(names, key=str.lower)
+
+    def _workspace_path(self, name: str) -> Path:
+        if name == self.DEFAULT_WORKSPACE:
+            return self.FAVORITES_FILE
+        return self.WORKSPACES_DIR / f"{name}.json"
+
+    def open_workspace(self, name: str) -> None:
+        """Show a workspace, loading it on first use and unloading the least recently used ones."""
+        previous = self.workspace
+        if previous is not None and previous.name == name:
+            return
+        workspace = self._loaded_workspaces.get(name)
+        is_new = workspace is None
+        if is_new:
+            workspace = Workspace(name, self._workspace_path(name))
+            self._build_workspace_panel(workspace)
+            self._loaded_workspaces[name] = workspace
+        self._loaded_workspaces.move_to_end(name)
+
+        if previous is not None:
+            previous.panel.grid_remove()
+        workspace.panel.grid(row=9, column=0, sticky="nsew")
+        self.workspace = workspace
+        self.workspace_var.set(name)
+        if is_new:
+            workspace.cvd_mode = self.cvd_mode
+            self._load_favorites()
+        else:
+            self._sync_favorites()
+            if workspace.cvd_mode != self.cvd_mode:
+                self._refresh_swatch_colors()
+        self._unload_idle_workspaces()
+        if previous is not None:
+            self._set_status(f"Switched to workspace {name}.", duration=2000)
+
+    def _unload_idle_workspaces(self) -> None:
+        idle = [name for name, workspace in self._loaded_workspaces.items() if workspace is not self.workspace]
+        for name in idle[: max(0, len(self._loaded_workspaces) - self.WORKSPACE_CACHE_LIMIT)]:
+            workspace = self._loaded_workspaces.pop(name)
+            self._save_favorites(workspace)
+            workspace.panel.destroy()
+
+    def new_workspace(self) -> None:
+        name = simpledialog.askstring("New workspace", "Workspace name:", parent=self.root)
+        if name is None:
+            return
+        name = name.strip()
+        if not re.fullmatch(r"[\w][\w .-]{0,63}", name):
+            messagebox.showerror("Invalid name", "Use letters, digits, spaces, dots, dashes or underscores.")
+            return
+        if name not in self._discover_workspaces():
+            try:
+                self.WORKSPACES_DIR.mkdir(parents=True, exist_ok=True)
+                with open(self._workspace_path(name), "w") as f:
+                    json.dump({"favorites": [], "history": []}, f, indent=2)
+            except Exception as e:
+                messagebox.showerror("Save Error", f"Failed to create workspace: {e}")
+                return
+            self.workspace_combo.configure(values=self._discover_workspaces())
+        self.open_workspace(name)
 
     def _resize_canvas_window(self, event) -> None:
         self.canvas.itemconfig(self._canvas_window, width=event.width)
 
+    def _in_main_window(self, event) -> bool:
+        widget = event.widget
+        return not isinstance(widget, tk.Misc) or widget.winfo_toplevel() is self.root
+
     def _on_mousewheel(self, event) -> None:
+        if not self._in_main_window(event):
+            return
         delta = int(-1 * (event.delta / 120))
         if delta:
             self._scroll_canvas(delta)
 
     def _on_linux_scroll(self, event) -> None:
+        if not self._in_main_window(event):
+            return
         if event.num == 4:
             self._scroll_canvas(-1)
         elif event.num == 5:
@@ -689,18 +3112,41 @@ class ColorPickerApp:
         for index, color in enumerate(colors[: self.HISTORY_LIMIT]):
             row = index // max_columns
             column = index % max_columns
+            shown = self._display_color(color)
             button = tk.Button(
                 parent,
-                bg=color,
-                activebackground=color,
+                bg=shown,
+                activebackground=shown,
                 width=3,
                 height=1,
                 relief="flat",
                 bd=0,
                 command=lambda value=color: command(value),
             )
+            button.swatch_color = color
             button.grid(row=row, column=column, padx=4, pady=4)
 
+    def _display_color(self, hex_value: str) -> str:
+        return simulate_cvd_hex(hex_value, self.cvd_mode)
+
+    def _refresh_swatch_colors(self) -> None:
+        for parent in (self.history_swatches, self.favorites_swatches):
+            for child in parent.winfo_children():
+                color = getattr(child, "swatch_color", None)
+                if color is not None:
+                    shown = self._display_color(color)
+                    child.configure(bg=shown, activebackground=shown)
+        self.workspace.cvd_mode = self.cvd_mode
+
+    def _on_cvd_mode_change(self, _event=None) -> None:
+        self.cvd_mode = self.cvd_mode_var.get().lower()
+        self.preview.itemconfig(self.preview_rect, fill=self._display_color(self.current_color["hex"]))
+        self._refresh_swatch_colors()
+        self.hsv_wheel.set_simulation(self.cvd_mode)
+        self._schedule_ramp_update()
+        label = "off" if self.cvd_mode == "normal" else self.cvd_mode
+        self._set_status(f"Vision simulation: {label}.", duration=2000)
+
     def _on_hsv_change(self, _value: str) -> None:
         if self._updating_hsv_controls:
             return
@@ -738,25 +3184,13 @@ class ColorPickerApp:
         self.set_color(hex_value, add_to_history=commit)
 
     def _relative_luminance(self, rgb: tuple[int, int, int]) -> float:
-        def channel_lum(channel: int) -> float:
-            srgb = channel / 255
-            return srgb / 12.92 if srgb <= 0.03928 else ((srgb + 0.055) / 1.055) ** 2.4
-
-        r, g, b = (channel_lum(c) for c in rgb)
-        return 0.2126 * r + 0.7152 * g + 0.0722 * b
+        return relative_luminance(rgb)
 
     def _contrast_ratio(self, rgb1: tuple[int, int, int], rgb2: tuple[int, int, int]) -> float:
-        l1 = self._relative_luminance(rgb1)
-        l2 = self._relative_luminance(rgb2)
-        lighter, darker = (l1, l2) if l1 >= l2 else (l2, l1)
-        return (lighter + 0.05) / (darker + 0.05)
+        return contrast_ratio(rgb1, rgb2)
 
     def _format_contrast_label(self, ratio: float) -> str:
-        if ratio >= 7:
-            return f"{ratio:.2f} (AAA)"
-        if ratio >= 4.5:
-            return f"{ratio:.2f} (AA)"
-        return f"{ratio:.2f} (Fail)"
+        return f"{ratio:.2f} ({contrast_rating(ratio)})"
 
     def _update_contrast(self) -> None:
         rgb = self.current_color["rgb"]
@@ -781,68 +3215,618 @@ class ColorPickerApp:
             self._update_contrast()
             self._set_status(f"Custom background set to {self.custom_background}.", duration=2000)
 
-    def export_palette(self) -> None:
+    def export_palette(self, payload: dict | None = None, title: str = "Export palette", dedupe: bool = True) -> None:
         path = filedialog.asksaveasfilename(
-            title="Export palette",
+            title=title,
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json")],
+            filetypes=self.PALETTE_FILETYPES,
         )
         if not path:
             return
 
-        payload = {"favorites": self.favorites, "history": self.history}
+        if payload is None:
+            payload = {"favorites": self.favorites, "history": self.history}
         try:
-            with open(path, "w", encoding="utf-8") as file:
-                json.dump(payload, file, indent=2)
+            write_palette_file(path, payload, dedupe)
             self._set_status(f"Exported palette to {path}.", duration=2500)
         except Exception as e:
             messagebox.showerror("Export Error", f"Failed to export palette: {e}")
 
+    def open_image_eyedropper(self) -> None:
+        if self._eyedropper is None or not self._eyedropper.winfo_exists():
+            self._eyedropper = ImageEyedropper(self.root, self._pick_from_image)
+            self._eyedropper.choose_image()
+        else:
+            self._eyedropper.lift()
+            self._eyedropper.focus_set()
+
+    def _pick_from_image(self, hex_value: str) -> None:
+        self.set_color(hex_value)
+        self._set_status(f"Picked {hex_value} from image.", duration=2500)
+
+    def _current_ramp(self) -> list[str]:
+        try:
+            steps = int(self.ramp_steps_var.get())
+        except ValueError:
+            return []
+        steps = int(_clamp(steps, 2, 4096))
+        space = self.ramp_space_var.get().lower()
+        color = self.current_color["hex"]
+        if self.ramp_kind_var.get() == "Tints & shades":
+            tints = (steps - 1) // 2
+            return tint_shade_scale(color, tints, steps - 1 - tints, space)
+        end = normalize_hex(self.ramp_end_var.get())
+        return generate_ramp(color, end, steps, space) if end else []
+
+    def _schedule_ramp_update(self) -> None:
+        if self._ramp_after_id is None:
+            self._ramp_after_id = self.root.after_idle(self._update_ramp)
+
+    def _update_ramp(self) -> None:
+        """Render the ramp as one image strip rather than a widget per step."""
+        self._ramp_after_id = None
+        self._ramp_colors = self._current_ramp()
+        width = max(1, self.ramp_canvas.winfo_width())
+        height = int(self.ramp_canvas.cget("height"))
+        if not self._ramp_colors:
+            self.ramp_canvas.itemconfigure(self._ramp_image_item, image="")
+            self.ramp_info_var.set("Enter a valid end color and step count.")
+            return
+        row = simulate_cvd_pixels(ramp_strip_row(self._ramp_colors, width), self.cvd_mode)
+        header = f"P6\n{width} {height}\n255\n".encode("ascii")
+        self._ramp_image = tk.PhotoImage(master=self.ramp_canvas, data=header + row * height, format="PPM")
+        self.ramp_canvas.itemconfigure(self._ramp_image_item, image=self._ramp_image)
+        self.ramp_info_var.set(
+            f"{len(self._ramp_colors)} steps: {self._ramp_colors[0]} → {self._ramp_colors[-1]} (click to pick)"
+        )
+
+    def _on_ramp_click(self, event) -> None:
+        if not self._ramp_colors:
+            return
+        width = max(1, self.ramp_canvas.winfo_width())
+        index = int(_clamp(event.x * len(self._ramp_colors) // width, 0, len(self._ramp_colors) - 1))
+        self.set_color(self._ramp_colors[index])
+
+    def export_ramp(self) -> None:
+        ramp = self._current_ramp()
+        if not ramp:
+            messagebox.showinfo("No ramp", "Enter a valid end color and step count first.")
+            return
+        self.export_palette({"favorites": ramp, "history": []}, title="Export ramp", dedupe=False)
+
     def import_palette(self) -> None:
-        path = filedialog.askopenfilename(title="Import palette", filetypes=[("JSON files", "*.json")])
+        path = filedialog.askopenfilename(title="Import palette", filetypes=self.PALETTE_FILETYPES)
         if not path:
             return
 
         try:
-            with open(path, "r", encoding="utf-8") as file:
-                payload = json.load(file)
-            favorites = payload.get("favorites", [])
-            history = payload.get("history", [])
+            favorites, history = read_palette_colors(path, self.HISTORY_LIMIT)
 
-            self.favorites = self._sanitize_palette(favorites)
-            self.history = self._sanitize_palette(history)
-
-            self.favorites_list.delete(0, tk.END)
-            for color in self.favorites:
-                self.favorites_list.insert(tk.END, color)
-            self.history_list.delete(0, tk.END)
-            for color in self.history:
-                self.history_list.insert(tk.END, color)
-
-            self._render_swatches(self.favorites_swatches, self.favorites, self.set_color)
+            self.history = history
+            self.history_filter.reset(self.history)
             self._render_swatches(self.history_swatches, self.history, self.set_color)
-            self._save_favorites()
+
+            self._record_favorites("reset", favorites)
             self._set_status("Imported palette successfully.", duration=2500)
         except Exception as e:
             messagebox.showerror("Import Error", f"Failed to import palette: {e}")
 
-    def _sanitize_palette(self, colors: list[str]) -> list[str]:
-        normalized: list[str] = []
-        for value in colors:
-            if not isinstance(value, str):
-                continue
-            hex_value = value.strip().upper()
-            if not hex_value.startswith("#"):
-                hex_value = f"#{hex_value}"
-            if re.fullmatch(r"#([0-9A-F]{3}|[0-9A-F]{6})", hex_value):
-                if len(hex_value) == 4:
-                    hex_value = f"#{hex_value[1]*2}{hex_value[2]*2}{hex_value[3]*2}"
-                if hex_value not in normalized:
-                    normalized.append(hex_value)
-        return normalized[: self.HISTORY_LIMIT]
 
+def convert_colors(hex_values: list[str]) -> list[dict]:
+    """Batch conversion of normalized ``#RRGGBB`` strings into every format the app displays."""
+    results = []
+    for hex_value in hex_values:
+        rgb = _hex_to_rgb(hex_value)
+        r, g, b = (channel / 255 for channel in rgb)
+        h, l, s = colorsys.rgb_to_hls(r, g, b)
+        hv, sv, vv = colorsys.rgb_to_hsv(r, g, b)
+        results.append(
+            {
+                "hex": hex_value,
+                "rgb": list(rgb),
+                "hsl": [round(h * 360, 2), round(s * 100, 2), round(l * 100, 2)],
+                "hsv": [round(hv * 360, 2), round(sv * 100, 2), round(vv * 100, 2)],
+                "oklab": [round(component, 5) for component in rgb_to_oklab(rgb)],
+                "luminance": round(relative_luminance(rgb), 6),
+            }
+        )
+    return results
+
+
+def _contrast_batch(pairs: list[tuple[str, str]]) -> list[dict]:
+    results = []
+    for foreground, background in pairs:
+        ratio = contrast_ratio(_hex_to_rgb(foreground), _hex_to_rgb(background))
+        results.append(
+            {"foreground": foreground, "background": background, "ratio": round(ratio, 4), "rating": contrast_rating(ratio)}
+        )
+    return results
+
+
+def _palette_digest(palette: tuple[str, ...]) -> bytes:
+    """Fixed-size cache key for a normalized palette (colors are all 7 characters, so joining is unambiguous)."""
+    return hashlib.blake2b("".join(palette).encode("ascii"), digest_size=16).digest()
+
+
+# OKLab coordinates of recently queried palettes, keyed by digest so no palette is kept twice.
+_PALETTE_OKLAB_LIMIT = 32
+_palette_oklab_cache: OrderedDict[bytes, tuple[tuple[float, float, float], ...]] = OrderedDict()
+
+
+def _palette_oklab(digest: bytes, palette: tuple[str, ...]) -> tuple[tuple[float, float, float], ...]:
+    labs = _palette_oklab_cache.get(digest)
+    if labs is None:
+        labs = tuple(rgb_to_oklab(_hex_to_rgb(color)) for color in palette)
+        _remember(_palette_oklab_cache, digest, labs, _PALETTE_OKLAB_LIMIT)
+    else:
+        _palette_oklab_cache.move_to_end(digest)
+    return labs
+
+
+def _nearest_batch(queries: list[tuple[str, tuple[str, ...], bytes]]) -> list[dict]:
+    results = []
+    for color, palette, digest in queries:
+        target = rgb_to_oklab(_hex_to_rgb(color))
+        distances = [math.dist(target, lab) for lab in _palette_oklab(digest, palette)]
+        best = min(range(len(palette)), key=distances.__getitem__)
+        results.append({"color": color, "nearest": palette[best], "index": best, "distance": round(distances[best], 6)})
+    return results
+
+
+class _MicroBatcher:
+    """Collect concurrent submissions and run them through one batch call.
+
+    A batch is flushed when it reaches ``limit`` items or ``delay`` seconds after its
+    first item arrived, whichever comes first.
+    """
+
+    def __init__(self, handler, limit: int, delay: float) -> None:
+        self.handler = handler
+        self.limit = limit
+        self.delay = delay
+        self.batches = 0
+        self._items: list = []
+        self._futures: list[asyncio.Future] = []
+        self._timer: asyncio.TimerHandle | None = None
+
+    def submit(self, item) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._items.append(item)
+        self._futures.append(future)
+        if len(self._items) >= self.limit:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.delay, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, futures = self._items, self._futures
+        self._items, self._futures = [], []
+        if not items:
+            return
+        self.batches += 1
+        try:
+            results = self.handler(items)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class _MethodNotAllowed(Exception):
+    """Raised by :meth:`ColorService.dispatch` for a known path requested with the wrong method."""
+
+
+class ColorService:
+    """Localhost JSON-over-HTTP front end to the color engine.
+
+    Endpoints (POST, JSON body): ``/convert``, ``/contrast``, ``/nearest`` and
+    ``/sanitize``; ``GET /stats`` reports counters. Single-color lookups are
+    micro-batched and memoized in a bounded LRU cache; ``/nearest`` entries are keyed
+    by a palette digest, and palettes (``MAX_PALETTE`` colors) and request bodies
+    (``MAX_BODY`` bytes) are capped, so the cache's memory stays bounded. Unknown
+    paths answer 404, known paths with the wrong method 405, malformed requests 400,
+    oversized bodies 413 and anything unexpected 500.
+    """
+
+    # path -> the one method it accepts
+    ENDPOINTS = {"/convert": "POST", "/contrast": "POST", "/nearest": "POST", "/sanitize": "POST", "/stats": "GET"}
+    CACHE_LIMIT = 4096
+    MAX_PALETTE = 4096
+    MAX_BODY = 1 << 20
+    BATCH_LIMIT = 256
+    BATCH_DELAY = 0.002
+
+    def __init__(self) -> None:
+        self._cache: OrderedDict[tuple, dict] = OrderedDict()
+        self._batchers = {
+            "convert": _MicroBatcher(convert_colors, self.BATCH_LIMIT, self.BATCH_DELAY),
+            "contrast": _MicroBatcher(_contrast_batch, self.BATCH_LIMIT, self.BATCH_DELAY),
+            "nearest": _MicroBatcher(_nearest_batch, self.BATCH_LIMIT, self.BATCH_DELAY),
+        }
+        self.requests = 0
+        self.cache_hits = 0
+        self.started = time.perf_counter()
+
+    async def dispatch(self, method: str, path: str, payload: dict) -> dict:
+        self.requests += 1
+        allowed = self.ENDPOINTS.get(path)
+        if allowed is None:
+            raise LookupError(f"unknown endpoint {path}")
+        if method != allowed:
+            raise _MethodNotAllowed(f"{path} only accepts {allowed}")
+        if path == "/stats":
+            return self.stats()
+        if path == "/convert":
+            if "colors" in payload:
+                colors = [_require_hex(value) for value in _require_list(payload, "colors")]
+                return {"results": await asyncio.gather(*(self._lookup("convert", color) for color in colors))}
+            return await self._lookup("convert", _require_hex(payload.get("color")))
+        if path == "/contrast":
+            pair = (_require_hex(payload.get("foreground")), _require_hex(payload.get("background", "#FFFFFF")))
+            return await self._lookup("contrast", pair)
+        if path == "/nearest":
+            colors = _require_list(payload, "palette")
+            if len(colors) > self.MAX_PALETTE:
+                raise ValueError(f"'palette' may hold at most {self.MAX_PALETTE} colors")
+            palette = tuple(sanitize_palette(colors))
+            if not palette:
+                raise ValueError("'palette' must contain at least one valid HEX color")
+            color, digest = _require_hex(payload.get("color")), _palette_digest(palette)
+            return await self._lookup("nearest", (color, palette, digest), key=(color, digest))
+        if path == "/sanitize":
+            limit = payload.get("limit")
+            if limit is not None and (not isinstance(limit, int) or limit < 0):
+                raise ValueError("'limit' must be a non-negative integer")
+            return {"colors": sanitize_palette(_require_list(payload, "colors"), limit)}
+
+    async def _lookup(self, kind: str, item, key=None) -> dict:
+        """Serve ``item`` from the cache under ``key`` (default: the item itself) or batch it."""
+        key = (kind, item if key is None else key)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+        result = await self._batchers[kind].submit(item)
+        _remember(self._cache, key, result, self.CACHE_LIMIT)
+        return result
+
+    def stats(self) -> dict:
+        uptime = time.perf_counter() - self.started
+        return {
+            "requests": self.requests,
+            "uptime": round(uptime, 3),
+            "requests_per_second": round(self.requests / uptime, 1) if uptime else 0.0,
+            "cache_entries": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "batches": {kind: batcher.batches for kind, batcher in self._batchers.items()},
+        }
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                parts = request_line.decode("latin-1").split()
+                headers = {}
+                while len(parts) == 3:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = headers.get("content-length") or "0"
+                if len(parts) != 3 or not length.isdecimal():
+                    # Without a request line or body length the stream cannot be re-synced.
+                    await self._write_response(writer, "400 Bad Request", {"error": "malformed request"}, False)
+                    break
+                if int(length) > self.MAX_BODY:
+                    error = {"error": f"request body exceeds {self.MAX_BODY} bytes"}
+                    await self._write_response(writer, "413 Payload Too Large", error, False)
+                    break
+                body = await reader.readexactly(int(length)) if int(length) else b""
+                method, path = parts[0].upper(), parts[1]
+                status, response = await self._respond(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                allow = self.ENDPOINTS.get(path) if status.startswith("405") else None
+                await self._write_response(writer, status, response, keep_alive, allow)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # ValueError: a request or header line longer than the stream's buffer limit.
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write_response(
+        writer: asyncio.StreamWriter, status: str, response: dict, keep_alive: bool, allow: str | None = None
+    ) -> None:
+        data = json.dumps(response).encode("utf-8")
+        head = f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+        if allow:
+            head += f"Allow: {allow}\r\n"
+        head += f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def _respond(self, method: str, path: str, body: bytes) -> tuple[str, dict]:
+        try:
+            payload = json.loads(body) if body else {}
+            if not isinstance(payload, dict):
+                raise ValueError("request body must be a JSON object")
+            return "200 OK", await self.dispatch(method, path, payload)
+        except _MethodNotAllowed as e:
+            return "405 Method Not Allowed", {"error": str(e)}
+        except LookupError as e:
+            return "404 Not Found", {"error": str(e)}
+        except ValueError as e:
+            return "400 Bad Request", {"error": str(e)}
+        except Exception as e:
+            # e.g. RecursionError from pathologically nested JSON; keep the connection usable.
+            return "500 Internal Server Error", {"error": f"internal error: {type(e).__name__}"}
+
+
+def _require_hex(value) -> str:
+    hex_value = normalize_hex(value)
+    if hex_value is None:
+        raise ValueError(f"invalid HEX color: {value!r}")
+    return hex_value
+
+
+def _require_list(payload: dict, key: str) -> list:
+    value = payload.get(key)
+    if not isinstance(value, list):
+        raise ValueError(f"'{key}' must be a list")
+    return value
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, ready=None) -> None:
+    service = ColorService()
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    if ready is not None:
+        ready(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
+
+
+async def load_test(host: str, port: int, connections: int, requests: int, seed: int = 0) -> dict:
+    """Drive ``requests`` mixed calls over ``connections`` keep-alive connections and time each one."""
+    rng = random.Random(seed)
+    palette = [f"#{rng.getrandbits(24):06X}" for _ in range(16)]
+    paths = ("/convert", "/contrast", "/nearest")
+    latencies: list[float] = []
+    errors = 0
+
+    def make_request() -> bytes:
+        path = rng.choice(paths)
+        color = f"#{rng.getrandbits(12):03X}"
+        if path == "/convert":
+            payload = {"color": color}
+        elif path == "/contrast":
+            payload = {"foreground": color, "background": rng.choice(palette)}
+        else:
+            payload = {"color": color, "palette": palette}
+        body = json.dumps(payload).encode("utf-8")
+        return f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+
+    async def worker(count: int) -> None:
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for _ in range(count):
+                request = make_request()
+                started = time.perf_counter()
+                writer.write(request)
+                await writer.drain()
+                status = await reader.readline()
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b""):
+                        break
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                await reader.readexactly(length)
+                latencies.append(time.perf_counter() - started)
+                if b" 200 " not in status:
+                    errors += 1
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    share, extra = divmod(requests, connections)
+    await asyncio.gather(*(worker(share + (1 if index < extra else 0)) for index in range(connections)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(fraction: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000.0
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def _read_palette_file(path: str) -> list[str]:
+    favorites, history = read_palette_colors(path)
+    return list(dict.fromkeys(favorites + history))
+
+
+def _convert_palette_command(args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    write_palette_file(args.output, read_palette_payload(args.source))
+    print(f"Wrote {args.output} in {time.perf_counter() - started:.3f}s")
+    return 0
+
+
+def _ramp_command(args: argparse.Namespace) -> int:
+    start = normalize_hex(args.start)
+    end = normalize_hex(args.end) if args.end else None
+    if start is None or (args.end and end is None):
+        print("Colors must be HEX values like #1A2B3C.", file=sys.stderr)
+        return 2
+    if end is None and args.steps is not None:
+        print("--steps needs an END color; use --tints/--shades for a single color.", file=sys.stderr)
+        return 2
+    if end is not None and (args.tints is not None or args.shades is not None):
+        print("--tints/--shades apply only without an END color; use --steps for a gradient.", file=sys.stderr)
+        return 2
+    if end is None:
+        tints = 4 if args.tints is None else args.tints
+        shades = 4 if args.shades is None else args.shades
+        colors = tint_shade_scale(start, tints, shades, args.space)
+    else:
+        colors = generate_ramp(start, end, 9 if args.steps is None else args.steps, args.space)
+    if args.output:
+        write_palette_file(args.output, {"favorites": colors, "history": []}, dedupe=False)
+        print(f"Wrote {len(colors)} colors to {args.output}")
+    else:
+        print("\n".join(colors))
+    return 0
+
+
+def _cvd_check_command(args: argparse.Namespace) -> int:
+    colors = _read_palette_file(args.palette)
+    modes = tuple(args.mode) if args.mode else CVD_MODES[1:]
+    conflicts = palette_cvd_conflicts(colors, modes, args.threshold)
+    for mode, first, second, distance in conflicts:
+        print(f"{mode:<14} {first} ~ {second}  (distance {distance:.3f})")
+    print(f"{len(colors)} colors checked, {len(conflicts)} indistinguishable pairs.")
+    return 1 if conflicts else 0
+
+
+def _bench_command(args: argparse.Namespace) -> int:
+    rng = random.Random(args.seed)
+    packed = array("I", (rng.getrandbits(24) for _ in range(args.colors)))
+    # The single-worker run is always measured first: it is the speedup baseline and
+    # the reference every other run's outputs must match.
+    worker_counts = [1] + sorted(set(args.workers or (2, 4, os.cpu_count() or 1)) - {1})
+    print(f"{args.colors} colors, chunk size {args.chunk_size}, {os.cpu_count()} CPUs")
+    baseline = None
+    reference = None
+    for workers in worker_counts:
+        started = time.perf_counter()
+        result = process_packed_colors(packed, workers=workers, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - started
+        outputs = (result.hex_codes, result.hsv, result.luminance, result.contrast)
+        if reference is None:
+            baseline, reference = elapsed, outputs
+        elif outputs != reference:
+            print(f"workers={workers}: output differs from the single-worker run")
+            return 1
+        print(
+            f"workers={workers:<3} {elapsed:8.3f}s  {args.colors / elapsed:12,.0f} colors/s  "
+            f"speedup {baseline / elapsed:5.2f}x"
+        )
+    return 0
+
+
+def _serve_command(args: argparse.Namespace) -> int:
+    def ready(port: int) -> None:
+        print(f"Serving color engine on http://{args.host}:{port} (Ctrl+C to stop)")
+
+    try:
+        asyncio.run(serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _load_test_command(args: argparse.Namespace) -> int:
+    async def run() -> dict:
+        if args.port:
+            return await load_test(args.host, args.port, args.connections, args.requests)
+        service = ColorService()
+        server = await asyncio.start_server(service.handle_connection, args.host, 0)
+        async with server:
+            port = server.sockets[0].getsockname()[1]
+            report = await load_test(args.host, port, args.connections, args.requests)
+            report["batches"] = service.stats()["batches"]
+            return report
+
+    report = asyncio.run(run())
+    print(
+        f"{report['requests']} requests in {report['seconds']:.2f}s over {args.connections} connections: "
+        f"{report['throughput']:,.0f} req/s, {report['errors']} errors"
+    )
+    print(f"latency p50 {report['p50_ms']:.2f} ms  p95 {report['p95_ms']:.2f} ms  p99 {report['p99_ms']:.2f} ms")
+    if "batches" in report:
+        print(f"batches: {report['batches']}")
+    return 1 if report["errors"] else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Color Palette Studio")
+    commands = parser.add_subparsers(dest="command")
+
+    cvd_parser = commands.add_parser("cvd-check", help="check a palette stays distinguishable under CVD simulation")
+    cvd_parser.add_argument("palette", help="palette file (.json export, JSON list of HEX strings, or .cpal)")
+    cvd_parser.add_argument("--mode", action="append", choices=CVD_MODES[1:], help="simulation to check (repeatable)")
+    cvd_parser.add_argument("--threshold", type=float, default=CVD_MIN_DISTANCE, help="minimum OKLab distance")
+    cvd_parser.set_defaults(handler=_cvd_check_command)
+
+    bench_parser = commands.add_parser("bench", help="benchmark the parallel palette engine")
+    bench_parser.add_argument("--colors", type=int, default=2_000_000, help="number of random colors")
+    bench_parser.add_argument("--workers", type=int, action="append", help="worker count to time in addition to the 1-worker baseline (repeatable)")
+    bench_parser.add_argument("--chunk-size", type=int, default=1 << 16, help="colors per worker task")
+    bench_parser.add_argument("--seed", type=int, default=0)
+    bench_parser.set_defaults(handler=_bench_command)
+
+    serve_parser = commands.add_parser("serve", help="run the color engine as a local JSON/HTTP service")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.set_defaults(handler=_serve_command)
+
+    load_parser = commands.add_parser("loadtest", help="measure service throughput and latency percentiles")
+    load_parser.add_argument("--host", default="127.0.0.1")
+    load_parser.add_argument("--port", type=int, default=0, help="running service port (0 starts one in-process)")
+    load_parser.add_argument("--connections", type=int, default=32)
+    load_parser.add_argument("--requests", type=int, default=20_000)
+    load_parser.set_defaults(handler=_load_test_command)
+
+    convert_parser = commands.add_parser("convert-palette", help="convert between .json and .cpal palettes")
+    convert_parser.add_argument("source")
+    convert_parser.add_argument("output", help="destination; the .cpal suffix selects the binary format")
+    convert_parser.set_defaults(handler=_convert_palette_command)
+
+    ramp_parser = commands.add_parser("ramp", help="generate a gradient, or a tint/shade scale when END is omitted")
+    ramp_parser.add_argument("start")
+    ramp_parser.add_argument("end", nargs="?")
+    ramp_parser.add_argument("--steps", type=int, help="gradient length including both ends (default 9; needs END)")
+    ramp_parser.add_argument("--space", choices=RAMP_SPACES, default="oklab", help="interpolation space")
+    ramp_parser.add_argument("--tints", type=int, help="lighter steps without END (default 4)")
+    ramp_parser.add_argument("--shades", type=int, help="darker steps without END (default 4)")
+    ramp_parser.add_argument("--output", help="write a palette file (.json or .cpal) instead of printing")
+    ramp_parser.set_defaults(handler=_ramp_command)
+
+    args = parser.parse_args(argv)
+    if args.command is not None:
+        return args.handler(args)
 
-if __name__ == "__main__":
     root = tk.Tk()
-    app = ColorPickerApp(root)
+    ColorPickerApp(root)
     root.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
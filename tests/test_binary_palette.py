@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+import unittest
+import types
+import sys
+
+if "ttkbootstrap" not in sys.modules:
+    class _FakeStyle:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        def configure(self, *args, **kwargs) -> None:
+            pass
+
+    sys.modules["ttkbootstrap"] = types.SimpleNamespace(Style=_FakeStyle)
+
+from color_picker import (
+    CPAL_HUE_BUCKETS,
+    CPAL_LIGHTNESS_BUCKETS,
+    BinaryPalette,
+    _CPAL_HEADER,
+    read_palette_colors,
+    read_palette_payload,
+    write_binary_palette,
+    write_palette_file,
+)
+
+
+class TestBinaryPalette(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self._tmp.name, name)
+
+    def test_json_round_trip(self) -> None:
+        payload = {"favorites": ["#3498DB", "#FF0000", "#00FF00"], "history": ["#1F2937", "#FFFFFF"]}
+        with open(self.path("in.json"), "w", encoding="utf-8") as file:
+            json.dump(payload, file)
+        write_palette_file(self.path("out.cpal"), read_palette_payload(self.path("in.json")))
+        self.assertEqual(read_palette_payload(self.path("out.cpal")), payload)
+        write_palette_file(self.path("back.json"), read_palette_payload(self.path("out.cpal")))
+        with open(self.path("back.json"), encoding="utf-8") as file:
+            self.assertEqual(json.load(file), payload)
+
+    def test_names_and_index(self) -> None:
+        colors = ["#FF0000", "#FF8080", "#0000FF", "#202020"]
+        write_binary_palette(self.path("p.cpal"), colors, names={"#0000FF": "Brand blue", "#FF0000": "Alert"})
+        with BinaryPalette(self.path("p.cpal")) as palette:
+            self.assertEqual(len(palette), 4)
+            self.assertEqual(palette[2], "#0000FF")
+            self.assertEqual(palette.records[0], 0xFF0000FF)
+            self.assertEqual(palette.name(2), "Brand blue")
+            self.assertIsNone(palette.name(1))
+            self.assertEqual(palette.query(hue=(350.0, 360.0)), [])
+            self.assertEqual(palette.query(hue=(0.0, 10.0)), [0, 1, 3])
+            self.assertEqual(palette.query(hue=(0.0, 10.0), lightness=(45.0, 55.0)), [0])
+            self.assertEqual(palette.query(hue=(200.0, 260.0)), [2])
+            self.assertEqual(palette.query(hue=(350.0, 10.0)), [0, 1, 3])
+            self.assertEqual(palette.query(hue=(230.0, 10.0), lightness=(45.0, 55.0)), [0, 2])
+            self.assertEqual(palette.to_payload()["names"], {"#FF0000": "Alert", "#0000FF": "Brand blue"})
+
+    def test_limited_read_stops_early(self) -> None:
+        history = ["#%06X" % (value * 7919 % 0x1000000) for value in range(5000)]
+        write_binary_palette(self.path("big.cpal"), ["#FF0000", "#FF0000", "#00FF00"], history)
+        favorites, recent = read_palette_colors(self.path("big.cpal"), 10)
+        self.assertEqual(favorites, ["#FF0000", "#00FF00"])
+        self.assertEqual(recent, history[:10])
+        favorites, recent = read_palette_colors(self.path("big.cpal"))
+        self.assertEqual(len(recent), 5000)
+
+    def test_ignores_malformed_names(self) -> None:
+        payload = {"favorites": ["#FF0000", "#0000FF"], "history": []}
+        write_palette_file(self.path("list.cpal"), dict(payload, names=["Alert"]))
+        self.assertEqual(read_palette_payload(self.path("list.cpal")), payload)
+        write_palette_file(self.path("mixed.cpal"), dict(payload, names={"#f00": "Alert", "#0000FF": 3, "nope": "x"}))
+        self.assertEqual(read_palette_payload(self.path("mixed.cpal"))["names"], {"#FF0000": "Alert"})
+
+    def test_rejects_corrupt_index(self) -> None:
+        write_binary_palette(self.path("p.cpal"), ["#FF0000", "#0000FF"])
+        with open(self.path("p.cpal"), "rb") as file:
+            data = bytearray(file.read())
+        index_offset = _CPAL_HEADER.unpack_from(data)[-1]
+        order_offset = index_offset + 4 * (CPAL_HUE_BUCKETS * CPAL_LIGHTNESS_BUCKETS + 1)
+        bad_order = data[:order_offset] + (999).to_bytes(4, "little") + data[order_offset + 4 :]
+        bad_starts = data[:index_offset] + (5).to_bytes(4, "little") + data[index_offset + 4 :]
+        with open(self.path("order.cpal"), "wb") as file:
+            file.write(bad_order)
+        with open(self.path("starts.cpal"), "wb") as file:
+            file.write(bad_starts)
+        with BinaryPalette(self.path("order.cpal")) as palette:
+            with self.assertRaises(ValueError):
+                palette.query()
+        with self.assertRaises(ValueError):
+            BinaryPalette(self.path("starts.cpal"))
+
+    def test_rejects_other_files(self) -> None:
+        with open(self.path("bad.cpal"), "wb") as file:
+            file.write(b"NOPE" + bytes(60))
+        with self.assertRaises(ValueError):
+            BinaryPalette(self.path("bad.cpal"))
+
+
+if __name__ == "__main__":
+    unittest.main()
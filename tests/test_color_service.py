@@ -0,0 +1,144 @@
+import asyncio
+import json
+import unittest
+import types
+import sys
+
+if "ttkbootstrap" not in sys.modules:
+    class _FakeStyle:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        def configure(self, *args, **kwargs) -> None:
+            pass
+
+    sys.modules["ttkbootstrap"] = types.SimpleNamespace(Style=_FakeStyle)
+
+from color_picker import ColorService, load_test
+
+
+class TestColorService(unittest.TestCase):
+    def test_concurrent_requests_share_a_batch(self) -> None:
+        async def run():
+            service = ColorService()
+            requests = [service.dispatch("POST", "/convert", {"color": f"#{i:06X}"}) for i in range(50)]
+            results = await asyncio.gather(*requests)
+            return service, results
+
+        service, results = asyncio.run(run())
+        self.assertEqual(results[17]["hex"], "#000011")
+        self.assertEqual(service.stats()["batches"]["convert"], 1)
+
+    def test_endpoints(self) -> None:
+        async def run():
+            service = ColorService()
+            contrast = await service.dispatch("POST", "/contrast", {"foreground": "#000", "background": "#fff"})
+            nearest = await service.dispatch("POST", "/nearest", {"color": "#FE0101", "palette": ["#00F", "#F00", "x"]})
+            sanitized = await service.dispatch("POST", "/sanitize", {"colors": ["abc", "#AABBCC", 3, "#123456"]})
+            cached = await service.dispatch("POST", "/contrast", {"foreground": "000000", "background": "#FFF"})
+            return service, contrast, nearest, sanitized, cached
+
+        service, contrast, nearest, sanitized, cached = asyncio.run(run())
+        self.assertEqual(contrast["ratio"], 21.0)
+        self.assertEqual(contrast["rating"], "AAA")
+        self.assertEqual(nearest["nearest"], "#FF0000")
+        self.assertEqual(sanitized["colors"], ["#AABBCC", "#123456"])
+        self.assertIs(cached, contrast)
+        self.assertEqual(service.cache_hits, 1)
+
+    def test_http_round_trip_and_errors(self) -> None:
+        async def run():
+            service = ColorService()
+            server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+            async with server:
+                port = server.sockets[0].getsockname()[1]
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                body = json.dumps({"color": "nothex"}).encode()
+                writer.write(b"POST /convert HTTP/1.1\r\nContent-Length: %d\r\nConnection: close\r\n\r\n" % len(body) + body)
+                response = await reader.read()
+                writer.close()
+                report = await load_test("127.0.0.1", port, connections=4, requests=40)
+            return response, report
+
+        response, report = asyncio.run(run())
+        self.assertTrue(response.startswith(b"HTTP/1.1 400"))
+        self.assertIn(b"invalid HEX color", response)
+        self.assertEqual(report["requests"], 40)
+        self.assertEqual(report["errors"], 0)
+
+    def test_error_statuses_keep_the_connection(self) -> None:
+        async def run():
+            service = ColorService()
+            server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+            async with server:
+                port = server.sockets[0].getsockname()[1]
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                nested = b"[" * 100000 + b"]" * 100000
+                requests = [
+                    b"GET /convert HTTP/1.1\r\n\r\n",
+                    b"POST /stats HTTP/1.1\r\n\r\n",
+                    b"GET /missing HTTP/1.1\r\n\r\n",
+                    b"POST /convert HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(nested) + nested,
+                    b"GET /stats HTTP/1.1\r\n\r\n",
+                ]
+                heads = []
+                for request in requests:
+                    writer.write(request)
+                    head = await reader.readuntil(b"\r\n\r\n")
+                    length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+                    await reader.readexactly(length)
+                    heads.append(head)
+                writer.close()
+
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"GARBAGE\r\n")
+                garbage = await reader.read()
+                writer.close()
+            return heads, garbage
+
+        heads, garbage = asyncio.run(run())
+        self.assertTrue(heads[0].startswith(b"HTTP/1.1 405"))
+        self.assertIn(b"Allow: POST\r\n", heads[0])
+        self.assertIn(b"Allow: GET\r\n", heads[1])
+        self.assertTrue(heads[2].startswith(b"HTTP/1.1 404"))
+        self.assertTrue(heads[3].startswith(b"HTTP/1.1 500"))
+        self.assertTrue(heads[4].startswith(b"HTTP/1.1 200"))
+        self.assertTrue(garbage.startswith(b"HTTP/1.1 400"))
+        self.assertIn(b"Connection: close", garbage)
+
+    def test_nearest_cache_is_keyed_by_palette_digest(self) -> None:
+        async def run():
+            service = ColorService()
+            first = await service.dispatch("POST", "/nearest", {"color": "#FE0101", "palette": ["#F00", "#00F"]})
+            second = await service.dispatch("POST", "/nearest", {"color": "#FE0101", "palette": ["#00F", "#F00"]})
+            again = await service.dispatch("POST", "/nearest", {"color": "#FE0101", "palette": ["#F00", "#00F", "x"]})
+            with self.assertRaises(ValueError):
+                await service.dispatch("POST", "/nearest", {"color": "#000", "palette": ["#000"] * 4097})
+            return service, first, second, again
+
+        service, first, second, again = asyncio.run(run())
+        self.assertEqual((first["index"], second["index"]), (0, 1))
+        self.assertIs(again, first)
+        # Cache keys hold a fixed-size digest, never the palette itself.
+        for kind, (color, digest) in service._cache:
+            self.assertEqual((kind, len(digest)), ("nearest", 16))
+
+    def test_oversized_body_is_rejected(self) -> None:
+        async def run():
+            service = ColorService()
+            server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+            async with server:
+                port = server.sockets[0].getsockname()[1]
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"POST /sanitize HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % (ColorService.MAX_BODY + 1))
+                response = await reader.read()
+                writer.close()
+            return response
+
+        response = asyncio.run(run())
+        self.assertTrue(response.startswith(b"HTTP/1.1 413"))
+        self.assertIn(b"Connection: close", response)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import types
+import sys
+
+if "ttkbootstrap" not in sys.modules:
+    class _FakeStyle:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        def configure(self, *args, **kwargs) -> None:
+            pass
+
+    sys.modules["ttkbootstrap"] = types.SimpleNamespace(Style=_FakeStyle)
+
+from color_picker import (
+    palette_cvd_conflicts,
+    simulate_cvd_hex,
+    simulate_cvd_palette,
+    simulate_cvd_pixels,
+    simulate_cvd_rgb,
+)
+
+
+class TestCvdSimulation(unittest.TestCase):
+    def test_neutral_colors_are_preserved(self) -> None:
+        for mode in ("protanopia", "deuteranopia", "tritanopia", "achromatopsia"):
+            for rgb in ((0, 0, 0), (255, 255, 255), (128, 128, 128)):
+                simulated = simulate_cvd_rgb(rgb, mode)
+                for got, expected in zip(simulated, rgb):
+                    self.assertLessEqual(abs(got - expected), 2)
+
+    def test_achromatopsia_is_grayscale(self) -> None:
+        r, g, b = simulate_cvd_rgb((52, 152, 219), "achromatopsia")
+        self.assertEqual(r, g)
+        self.assertEqual(g, b)
+
+    def test_pixels_match_palette(self) -> None:
+        palette = ["#FF0000", "#00FF00", "#3498DB", "#FF0000"]
+        data = bytes.fromhex("".join(color[1:] for color in palette))
+        simulated = simulate_cvd_pixels(data, "deuteranopia")
+        expected = "".join(color[1:] for color in simulate_cvd_palette(palette, "deuteranopia"))
+        self.assertEqual(simulated.hex().upper(), expected)
+        self.assertEqual(simulate_cvd_hex("#3498DB", "normal"), "#3498DB")
+
+    def test_red_green_conflict_detected(self) -> None:
+        conflicts = palette_cvd_conflicts(["#D43F3A", "#5B8C2A"], threshold=0.1)
+        modes = {mode for mode, *_ in conflicts}
+        self.assertIn("deuteranopia", modes)
+        self.assertNotIn("tritanopia", modes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+import types
+import sys
+from pathlib import Path
+
+if "ttkbootstrap" not in sys.modules:
+    class _FakeStyle:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        def configure(self, *args, **kwargs) -> None:
+            pass
+
+    sys.modules["ttkbootstrap"] = types.SimpleNamespace(Style=_FakeStyle)
+
+import color_picker
+from color_picker import FavoritesJournal, apply_journal_ops
+
+
+class TestFavoritesJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "favorites.json.journal"
+
+    def test_instances_converge(self) -> None:
+        first, second = FavoritesJournal(self.path), FavoritesJournal(self.path)
+        first.append("reset", ["#111111", "#222222"])
+        first_state, second_state = [], []
+        apply_journal_ops(first_state, first.read_new())
+        apply_journal_ops(second_state, second.read_new())
+
+        first.append("add", ["#333333"])
+        second.append("remove", ["#111111"])
+        second.append("add", ["#444444", "#333333"])
+        first.append("remove", ["#444444"])
+
+        changes = apply_journal_ops(first_state, first.read_new())
+        apply_journal_ops(second_state, second.read_new())
+        self.assertEqual(first_state, ["#222222", "#333333"])
+        self.assertEqual(second_state, first_state)
+        self.assertEqual(changes, [("add", "#333333"), ("remove", "#111111"), ("add", "#444444"), ("remove", "#444444")])
+
+    def test_polling_reads_only_new_entries(self) -> None:
+        writer, reader = FavoritesJournal(self.path), FavoritesJournal(self.path)
+        self.assertFalse(reader.changed())
+        writer.append("add", ["#ABCDEF"])
+        self.assertTrue(reader.changed())
+        self.assertEqual(len(reader.read_new()), 1)
+        self.assertFalse(reader.changed())
+        self.assertEqual(reader.read_new(), [])
+
+        with open(self.path, "ab") as file:
+            file.write(b'{"op":"add","colors":["#000001"]')
+        self.assertEqual(reader.read_new(), [])
+        with open(self.path, "ab") as file:
+            file.write(b',"origin":"x"}\n')
+        self.assertEqual(reader.read_new()[0]["colors"], ["#000001"])
+
+    def test_rewritten_journal_is_reread(self) -> None:
+        journal = FavoritesJournal(self.path)
+        journal.append("add", ["#ABCDEF"])
+        journal.read_new()
+        replacement = self.path.with_suffix(".tmp")
+        FavoritesJournal(replacement).append("reset", ["#123456"])
+        os.replace(replacement, self.path)
+        state = ["#ABCDEF"]
+        apply_journal_ops(state, journal.read_new())
+        self.assertEqual(state, ["#123456"])
+
+    def test_large_journal_is_compacted(self) -> None:
+        writer, reader = FavoritesJournal(self.path), FavoritesJournal(self.path)
+        writer.COMPACT_BYTES = 512
+        state: list[str] = []
+        for value in range(40):
+            writer.append("add", ["#%06X" % value])
+            apply_journal_ops(state, writer.read_new())
+            if value == 5:
+                reader_state: list[str] = []
+                apply_journal_ops(reader_state, reader.read_new())
+        self.assertTrue(writer.compact(state))
+        with open(self.path, encoding="utf-8") as file:
+            self.assertEqual(len(file.readlines()), 1)
+        self.assertFalse(writer.changed())
+        self.assertEqual(writer.read_new(), [])
+
+        self.assertTrue(reader.changed())
+        apply_journal_ops(reader_state, reader.read_new())
+        self.assertEqual(reader_state, state)
+        self.assertEqual(sorted(self.path.parent.iterdir()), [self.path, writer.lock_path])
+
+    def test_compaction_waits_for_unread_entries(self) -> None:
+        writer, other = FavoritesJournal(self.path), FavoritesJournal(self.path)
+        writer.COMPACT_BYTES = 0
+        writer.append("add", ["#111111"])
+        state: list[str] = []
+        apply_journal_ops(state, writer.read_new())
+        other.append("add", ["#222222"])
+        self.assertFalse(writer.compact(state))
+        apply_journal_ops(state, writer.read_new())
+        self.assertTrue(writer.compact(state))
+        fresh: list[str] = []
+        apply_journal_ops(fresh, FavoritesJournal(self.path).read_new())
+        self.assertEqual(fresh, ["#111111", "#222222"])
+
+    def test_append_during_compaction_is_kept(self) -> None:
+        writer, other = FavoritesJournal(self.path), FavoritesJournal(self.path)
+        writer.COMPACT_BYTES = 0
+        writer.append("add", ["#111111"])
+        state: list[str] = []
+        apply_journal_ops(state, writer.read_new())
+
+        # Another window appends after compact() has checked the size but before it replaces the file.
+        racer = threading.Thread(target=other.append, args=("add", ["#222222"]))
+        real_replace = os.replace
+
+        def replace(source, target) -> None:
+            racer.start()
+            time.sleep(0.05)
+            real_replace(source, target)
+
+        color_picker.os.replace = replace
+        try:
+            self.assertTrue(writer.compact(state))
+        finally:
+            color_picker.os.replace = real_replace
+        racer.join()
+
+        apply_journal_ops(state, writer.read_new())
+        fresh: list[str] = []
+        apply_journal_ops(fresh, FavoritesJournal(self.path).read_new())
+        self.assertEqual(state, ["#111111", "#222222"])
+        self.assertEqual(fresh, state)
+
+
+if __name__ == "__main__":
+    unittest.main()
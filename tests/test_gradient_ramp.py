@@ -0,0 +1,96 @@
+import contextlib
+import io
+import math
+import os
+import tempfile
+import unittest
+import types
+import sys
+
+if "ttkbootstrap" not in sys.modules:
+    class _FakeStyle:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        def configure(self, *args, **kwargs) -> None:
+            pass
+
+    sys.modules["ttkbootstrap"] = types.SimpleNamespace(Style=_FakeStyle)
+
+from color_picker import (
+    RAMP_SPACES,
+    _hex_to_rgb,
+    generate_ramp,
+    main,
+    oklab_to_rgb,
+    ramp_strip_row,
+    read_palette_payload,
+    rgb_to_oklab,
+    tint_shade_scale,
+)
+
+
+class TestGradientRamp(unittest.TestCase):
+    def test_oklab_round_trip(self) -> None:
+        for color in ("#000000", "#FFFFFF", "#3498DB", "#E74C3C", "#7F7F00"):
+            rgb = _hex_to_rgb(color)
+            self.assertEqual(oklab_to_rgb(rgb_to_oklab(rgb)), rgb)
+
+    def test_endpoints_and_length(self) -> None:
+        for space in RAMP_SPACES:
+            ramp = generate_ramp("#3498DB", "#E74C3C", 7, space)
+            self.assertEqual(len(ramp), 7)
+            self.assertEqual(ramp[0], "#3498DB")
+            self.assertEqual(ramp[-1], "#E74C3C")
+        self.assertEqual(generate_ramp("#3498DB", "#E74C3C", 1), ["#3498DB"])
+        with self.assertRaises(ValueError):
+            generate_ramp("#000000", "#FFFFFF", 3, "rgb")
+
+    def test_oklab_lightness_is_even(self) -> None:
+        ramp = generate_ramp("#000000", "#FFFFFF", 11, "oklab")
+        lightness = [rgb_to_oklab(_hex_to_rgb(color))[0] for color in ramp]
+        steps = [b - a for a, b in zip(lightness, lightness[1:])]
+        self.assertLess(max(steps) - min(steps), 0.01)
+
+    def test_hue_takes_shortest_arc(self) -> None:
+        # Red to magenta passes through pink, not through green and blue.
+        middle = generate_ramp("#FF0000", "#FF00FF", 3, "hsv")[1]
+        self.assertEqual(middle, "#FF0080")
+        # A grey endpoint keeps the chromatic endpoint's hue.
+        _, a_end, b_end = rgb_to_oklab((255, 0, 0))
+        for color in generate_ramp("#808080", "#FF0000", 5, "oklch")[1:]:
+            _, a, b = rgb_to_oklab(_hex_to_rgb(color))
+            self.assertAlmostEqual(math.atan2(b, a), math.atan2(b_end, a_end), delta=0.05)
+
+    def test_tint_shade_scale(self) -> None:
+        scale = tint_shade_scale("#3498DB", tints=3, shades=2)
+        self.assertEqual(len(scale), 6)
+        self.assertEqual(scale[3], "#3498DB")
+        lightness = [rgb_to_oklab(_hex_to_rgb(color))[0] for color in scale]
+        self.assertEqual(lightness, sorted(lightness, reverse=True))
+        self.assertNotIn("#FFFFFF", scale)
+        self.assertNotIn("#000000", scale)
+
+    def test_strip_row(self) -> None:
+        row = ramp_strip_row(["#FF0000", "#0000FF"], 4)
+        self.assertEqual(row, bytes.fromhex("FF0000" * 2 + "0000FF" * 2))
+        self.assertEqual(len(ramp_strip_row(generate_ramp("#000000", "#FFFFFF", 4096), 300)), 900)
+
+    def test_ramp_export_keeps_repeated_steps(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            for name in ("ramp.json", "ramp.cpal"):
+                path = os.path.join(folder, name)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    self.assertEqual(main(["ramp", "#000000", "#010101", "--steps", "50", "--output", path]), 0)
+                favorites = read_palette_payload(path)["favorites"]
+                self.assertEqual(favorites, generate_ramp("#000000", "#010101", 50), name)
+
+    def test_ramp_command_rejects_mismatched_options(self) -> None:
+        with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(main(["ramp", "#3498DB", "--steps", "5"]), 2)
+            self.assertEqual(main(["ramp", "#3498DB", "#E74C3C", "--tints", "2"]), 2)
+            self.assertEqual(main(["ramp", "#3498DB", "--tints", "2", "--shades", "1"]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
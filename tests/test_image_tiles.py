@@ -0,0 +1,119 @@
+import os
+import random
+import tempfile
+import unittest
+import types
+import sys
+
+if "ttkbootstrap" not in sys.modules:
+    class _FakeStyle:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        def configure(self, *args, **kwargs) -> None:
+            pass
+
+    sys.modules["ttkbootstrap"] = types.SimpleNamespace(Style=_FakeStyle)
+
+from color_picker import (
+    IMAGE_TILE,
+    MipPyramid,
+    MmapRaster,
+    average_rgb,
+    display_size,
+    downsample_rgb,
+    fit_zoom_exp,
+    parse_ppm_header,
+    sample_box,
+    tile_source_box,
+    visible_tiles,
+)
+
+
+def _pixel(x: int, y: int) -> bytes:
+    return bytes((x % 256, y % 256, (x + y) % 256))
+
+
+class TestImageTiles(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.width, self.height = 37, 21
+        self.path = os.path.join(self._tmp.name, "image.ppm")
+        with open(self.path, "wb") as file:
+            file.write(f"P6\n# sample\n{self.width} {self.height}\n255\n".encode("ascii"))
+            for y in range(self.height):
+                file.write(b"".join(_pixel(x, y) for x in range(self.width)))
+
+    def test_header(self) -> None:
+        with open(self.path, "rb") as file:
+            data = file.read()
+        self.assertEqual(parse_ppm_header(data), (37, 21, len(data) - 37 * 21 * 3))
+        with self.assertRaises(ValueError):
+            parse_ppm_header(data[:-1])
+        with self.assertRaises(ValueError):
+            parse_ppm_header(b"P3\n1 1\n255\n0 0 0")
+
+    def test_region_and_mip_stride(self) -> None:
+        raster = MmapRaster(self.path)
+        self.addCleanup(raster.close)
+        self.assertEqual(raster.region(3, 4, 6, 5), _pixel(3, 4) + _pixel(4, 4) + _pixel(5, 4))
+        expected = b"".join(_pixel(x, y) for y in range(0, 21, 4) for x in range(1, 37, 4))
+        self.assertEqual(raster.region(1, 0, 37, 21, 4), expected)
+
+    def test_tile_math(self) -> None:
+        self.assertEqual(display_size(1000, 600, -2), (250, 150))
+        self.assertEqual(display_size(1000, 600, 1), (2000, 1200))
+        self.assertEqual(fit_zoom_exp(8000, 6000, 900, 600), -4)
+        self.assertEqual(fit_zoom_exp(300, 200, 900, 600), 0)
+        self.assertEqual(tile_source_box(1, 2, -2, 5000, 2500, tile=256), (1024, 2048, 2048, 2500, 4))
+        self.assertEqual(tile_source_box(3, 0, 3, 5000, 2500, tile=256), (96, 0, 128, 32, 1))
+        # Only tiles overlapping the view (and the image) are requested.
+        self.assertEqual(visible_tiles(300, -100, 400, 300, 1000, 1000, tile=256), [(1, 0), (2, 0)])
+        self.assertEqual(visible_tiles(-500, 0, 400, 300, 1000, 1000, tile=256), [])
+
+    def test_sampling(self) -> None:
+        self.assertEqual(sample_box(0, 0, 3, 10, 10), (0, 0, 2, 2))
+        self.assertEqual(sample_box(5, 5, 3, 10, 10), (4, 4, 7, 7))
+        raster = MmapRaster(self.path)
+        self.addCleanup(raster.close)
+        self.assertEqual(average_rgb(raster.region(*sample_box(10, 10, 3, 37, 21))), (10, 10, 20))
+        self.assertEqual(average_rgb(bytes((0, 0, 0, 255, 255, 1))), (128, 128, 0))
+
+    def test_downsample_is_a_box_filter(self) -> None:
+        rng = random.Random(5)
+        for width, height in ((8, 6), (7, 5), (1, 1), (3, 8)):
+            pixels = bytes(rng.getrandbits(8) for _ in range(width * height * 3))
+            expected = bytearray()
+            for y in range(0, height, 2):
+                for x in range(0, width, 2):
+                    block = [(min(x + dx, width - 1), min(y + dy, height - 1)) for dy in (0, 1) for dx in (0, 1)]
+                    for channel in range(3):
+                        total = sum(pixels[(by * width + bx) * 3 + channel] for bx, by in block)
+                        expected.append((total + 2) >> 2)
+            self.assertEqual(downsample_rgb(pixels, width, height), (bytes(expected), -(-width // 2), -(-height // 2)))
+
+    def test_pyramid_tiles_average_every_source_pixel(self) -> None:
+        rng = random.Random(9)
+        width, height = IMAGE_TILE * 2 + 90, IMAGE_TILE + 45
+        source = bytes(rng.getrandbits(8) for _ in range(width * height * 3))
+
+        def region(x0, y0, x1, y1, step=1):
+            return b"".join(source[(y * width + x0) * 3 : (y * width + x1) * 3] for y in range(y0, y1))
+
+        pyramid = MipPyramid(types.SimpleNamespace(width=width, height=height, region=region))
+        level = (source, width, height)
+        for depth in (1, 2):
+            level = downsample_rgb(*level)
+            pixels, level_width, level_height = level
+            self.assertEqual(pyramid.level_size(depth), (level_width, level_height))
+            tile_pixels, tile_width, tile_height = pyramid.tile(depth, 0, 0)
+            self.assertEqual((tile_width, tile_height), (min(IMAGE_TILE, level_width), min(IMAGE_TILE, level_height)))
+            expected = b"".join(
+                pixels[y * level_width * 3 : (y * level_width + tile_width) * 3] for y in range(tile_height)
+            )
+            self.assertEqual(tile_pixels, expected, depth)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import colorsys
+import unittest
+import types
+import sys
+from array import array
+
+if "ttkbootstrap" not in sys.modules:
+    class _FakeStyle:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        def configure(self, *args, **kwargs) -> None:
+            pass
+
+    sys.modules["ttkbootstrap"] = types.SimpleNamespace(Style=_FakeStyle)
+
+from color_picker import contrast_ratio, pack_hex_colors, process_packed_colors, relative_luminance
+
+
+class TestPaletteEngine(unittest.TestCase):
+    def test_pack_hex_colors_sanitizes(self) -> None:
+        packed = pack_hex_colors(["#abc", "3498db", "nope", 12, " #FF0000 "])
+        self.assertEqual(list(packed), [0xAABBCC, 0x3498DB, 0xFF0000])
+
+    def test_results_match_gui_functions(self) -> None:
+        packed = pack_hex_colors(["#3498DB", "#000000", "#FFFFFF", "#1F2937"])
+        result = process_packed_colors(packed, background=(31, 41, 55), workers=1)
+        self.assertEqual(len(result), 4)
+        self.assertEqual(result.hex_at(0), "#3498DB")
+        self.assertAlmostEqual(result.luminance[0], relative_luminance((52, 152, 219)))
+        self.assertAlmostEqual(result.contrast[2], contrast_ratio((255, 255, 255), (31, 41, 55)))
+        self.assertAlmostEqual(result.contrast[3], 1.0)
+        h, s, v = colorsys.rgb_to_hsv(52 / 255, 152 / 255, 219 / 255)
+        self.assertAlmostEqual(result.hsv[0], h * 360.0, places=3)
+        self.assertAlmostEqual(result.hsv[1], s * 100.0, places=3)
+        self.assertAlmostEqual(result.hsv[2], v * 100.0, places=3)
+
+    def test_pool_output_is_deterministic(self) -> None:
+        packed = array("I", ((i * 2654435761) & 0xFFFFFF for i in range(5000)))
+        serial = process_packed_colors(packed, workers=1, chunk_size=700)
+        parallel = process_packed_colors(packed, workers=3, chunk_size=700)
+        self.assertEqual(serial.hex_codes, parallel.hex_codes)
+        self.assertEqual(serial.contrast, parallel.contrast)
+        self.assertEqual(serial.hsv, parallel.hsv)
+
+
+if __name__ == "__main__":
+    unittest.main()
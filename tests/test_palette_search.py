@@ -0,0 +1,211 @@
+import random
+import unittest
+import types
+import sys
+
+if "ttkbootstrap" not in sys.modules:
+    class _FakeStyle:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        def configure(self, *args, **kwargs) -> None:
+            pass
+
+    sys.modules["ttkbootstrap"] = types.SimpleNamespace(Style=_FakeStyle)
+
+from color_picker import PaletteIndex, PaletteListFilter, listbox_diff_ops
+
+
+class _FakeListbox:
+    def __init__(self, height: int = 6) -> None:
+        self.items: list[str] = []
+        self.selected: set[int] = set()
+        self.height = height
+        self.calls = 0
+        self.pending: dict[str, object] = {}
+
+    def after(self, delay, callback) -> str:
+        after_id = f"after#{len(self.pending)}-{id(callback)}"
+        self.pending[after_id] = callback
+        return after_id
+
+    def after_cancel(self, after_id) -> None:
+        self.pending.pop(after_id, None)
+
+    def run_pending(self) -> int:
+        """Run scheduled callbacks like the Tk event loop; returns how many ran."""
+        slices = 0
+        while self.pending:
+            callback = self.pending.pop(next(iter(self.pending)))
+            callback()
+            slices += 1
+        return slices
+
+    def cget(self, option: str):
+        return self.height
+
+    def bind(self, sequence, callback) -> None:
+        pass
+
+    def get(self, index) -> str:
+        return self.items[int(index)]
+
+    def curselection(self) -> tuple[int, ...]:
+        return tuple(sorted(self.selected))
+
+    def selection_set(self, index) -> None:
+        self.selected.add(int(index))
+
+    def insert(self, index, *items) -> None:
+        # Like Tk, rows below the insertion point keep their selection.
+        self.calls += 1
+        position = len(self.items) if index == "end" else int(index)
+        self.items[position:position] = items
+        self.selected = {row + len(items) if row >= position else row for row in self.selected}
+
+    def delete(self, first, last=None) -> None:
+        self.calls += 1
+        first = int(first)
+        last = len(self.items) - 1 if last == "end" else (first if last is None else int(last))
+        del self.items[first : last + 1]
+        count = last + 1 - first
+        self.selected = {row - count if row > last else row for row in self.selected if not first <= row <= last}
+
+
+class _FakeScrollbar:
+    def __init__(self) -> None:
+        self.command = None
+        self.fractions = (0.0, 1.0)
+
+    def configure(self, command) -> None:
+        self.command = command
+
+    def set(self, first: float, last: float) -> None:
+        self.fractions = (first, last)
+
+
+class TestPaletteSearch(unittest.TestCase):
+    def test_query_terms(self) -> None:
+        index = PaletteIndex()
+        for position, color in enumerate(["#FF0000", "#FF8800", "#3A6699", "#3A0000", "#336699", "#FFFFFF"]):
+            index.add(color, position)
+        self.assertEqual(index.search("#3a"), {"#3A6699", "#3A0000"})
+        self.assertEqual(index.search("h:350-10"), {"#FF0000", "#3A0000", "#FFFFFF"})
+        self.assertEqual(index.search("h:350-10 l:40-60"), {"#FF0000"})
+        self.assertEqual(index.search("near:#336699~0.05"), {"#336699", "#3A6699"})
+        self.assertIsNone(index.search("h:20- near:#12"))
+        index.remove("#3A6699")
+        self.assertEqual(index.search("3A"), {"#3A0000"})
+        self.assertEqual(index.ordered(index.search("FF")), ["#FF0000", "#FF8800", "#FFFFFF"])
+
+    def test_refinement_matches_fresh_search(self) -> None:
+        index = PaletteIndex()
+        rng = random.Random(11)
+        colors = list(dict.fromkeys(f"#{rng.getrandbits(24):06X}" for _ in range(3000)))
+        for position, color in enumerate(colors):
+            index.add(color, position)
+        self.assertTrue(PaletteIndex.narrows(PaletteIndex.parse_query("3"), PaletteIndex.parse_query("3A h:10-20")))
+        self.assertTrue(PaletteIndex.narrows(PaletteIndex.parse_query("h:350-20"), PaletteIndex.parse_query("h:0-10")))
+        self.assertFalse(PaletteIndex.narrows(PaletteIndex.parse_query("h:1-3"), PaletteIndex.parse_query("h:1-30")))
+        self.assertFalse(PaletteIndex.narrows(PaletteIndex.parse_query("near:#336699~0.1"), PaletteIndex.parse_query("near:#336699~0.2")))
+        for query in ("3", "h:100-200 l:20-50", "near:#808080~0.2", "near:#336699~0.05 A"):
+            expected = index.ordered(index.search(query))
+            self.assertEqual(index.refine(index.ordered(), PaletteIndex.parse_query(query)), expected, query)
+
+    def test_listbox_diff_ops(self) -> None:
+        cases = [
+            (list("abcdef"), list("bcdefg")),
+            (list("abcdef"), list("zabcde")),
+            (list("abcdef"), list("eabcdf")),
+            (list("abcdef"), list("xyz")),
+            ([], list("abc")),
+            (list("abc"), []),
+            (list("abcdef"), list("acdf")),
+        ]
+        for old, new in cases:
+            rows = list(old)
+            ops = listbox_diff_ops(old, new)
+            for op, position, argument in ops:
+                if op == "delete":
+                    del rows[position : position + argument]
+                else:
+                    rows[position:position] = argument
+            self.assertEqual(rows, new, (old, new))
+        self.assertEqual(listbox_diff_ops(list("abcdef"), list("bcdefg")), [("delete", 0, 1), ("insert", 5, ["g"])])
+        self.assertEqual(listbox_diff_ops(list("abcdef"), list("eabcdf")), [("delete", 4, 1), ("insert", 0, ["e"])])
+
+    def test_listbox_shows_window_of_filter(self) -> None:
+        listbox, scrollbar = _FakeListbox(height=5), _FakeScrollbar()
+        list_filter = PaletteListFilter(listbox, scrollbar)
+        rng = random.Random(7)
+        colors = list(dict.fromkeys(f"#{rng.getrandbits(24):06X}" for _ in range(2000)))
+        list_filter.reset(colors)
+        for query in ("A", "AB", "ABC", "AB", "", "h:100-200", "h:100-200 l:20-50", "near:#808080", ""):
+            list_filter.set_query(query)
+            listbox.run_pending()
+            matches = list_filter.index.search(query)
+            self.assertEqual(list_filter.visible, [c for c in colors if matches is None or c in matches], query)
+            self.assertEqual(listbox.items, list_filter.visible[:5], query)
+        scrollbar.command("moveto", "0.5")
+        self.assertEqual(listbox.items, colors[1000:1005])
+        self.assertEqual(scrollbar.fractions, (0.5, 1005 / 2000))
+        scrollbar.command("scroll", "1", "pages")
+        self.assertEqual(listbox.items, colors[1005:1010])
+        listbox.selection_set(2)
+        calls = listbox.calls
+        list_filter.append("#F00001")
+        scrollbar.command("scroll", "1", "units")
+        self.assertEqual(listbox.items, colors[1006:1011])
+        self.assertEqual(listbox.calls - calls, 2)
+        self.assertEqual(listbox.curselection(), (1,))
+        list_filter.set_query("F")
+        listbox.run_pending()
+        list_filter.append("#000001")
+        list_filter.prepend("#FABCDE")
+        list_filter.remove(colors[0])
+        self.assertEqual(listbox.items, list_filter.visible[:5])
+        self.assertEqual(list_filter.visible[0], "#FABCDE")
+        self.assertEqual(list_filter.visible[-1], "#F00001")
+        self.assertNotIn("#000001", list_filter.visible)
+
+    def test_searches_at_100k_are_sliced(self) -> None:
+        rng = random.Random(3)
+        colors = list(dict.fromkeys(f"#{rng.getrandbits(24):06X}" for _ in range(100_000)))
+        listbox = _FakeListbox(height=20)
+        list_filter = PaletteListFilter(listbox)
+        # With no budget every slice runs exactly one step, so slices count the steps.
+        list_filter.FRAME_BUDGET = 0.0
+        list_filter.reset(colors)
+        queries = (
+            "3",
+            "3A",
+            "3A6",
+            "3A",
+            "3",
+            "",
+            "h:10-20",
+            "",
+            "near:#336699~0.2",
+            "",
+            "h:0-359 l:0-50",
+            "h:0-359 l:0-50 near:#808080~0.3",
+            "",
+        )
+        full_scans = ("near:#336699~0.2", "h:0-359 l:0-50")
+        for query in queries:
+            calls = listbox.calls
+            list_filter.set_query(query)
+            slices = listbox.run_pending()
+            # Edits are bounded by the rows on screen, not by how many colors match.
+            self.assertLessEqual(listbox.calls - calls, listbox.height, query)
+            self.assertEqual(listbox.items, list_filter.visible[:20], query)
+            if query in full_scans:
+                # Steps touch bounded chunks of colors, so a scan of the whole index is spread
+                # over many event-loop slices instead of blocking one.
+                self.assertGreaterEqual(slices, 10, query)
+            matches = list_filter.index.search(query)
+            self.assertEqual(len(list_filter.visible), len(colors) if matches is None else len(matches), query)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import colorsys
+import time
+import unittest
+import types
+import sys
+
+if "ttkbootstrap" not in sys.modules:
+    class _FakeStyle:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        def configure(self, *args, **kwargs) -> None:
+            pass
+
+    sys.modules["ttkbootstrap"] = types.SimpleNamespace(Style=_FakeStyle)
+
+from color_picker import (
+    HsvWheel,
+    hsv_triangle_vertices,
+    hue_ring_band,
+    paint_triangle_band,
+    point_from_barycentric,
+    weights_from_sv,
+)
+
+
+def _pixel(buffer: bytes, size: int, x: float, y: float) -> tuple[int, int, int]:
+    offset = (int(y) * size + int(x)) * 3
+    return tuple(buffer[offset : offset + 3])
+
+
+class TestWheelRender(unittest.TestCase):
+    def test_triangle_pixels_match_hsv(self) -> None:
+        size, hue = 200, 130.0
+        background = b"\x10\x20\x30"
+        buffer = bytearray(background * size * size)
+        vertices = hsv_triangle_vertices(100.0, 100.0, 70.0, hue)
+        paint_triangle_band(buffer, size, vertices, hue, 0, size)
+        for s, v in ((0.5, 0.5), (0.2, 0.9), (0.9, 0.3)):
+            x, y = point_from_barycentric(vertices, weights_from_sv(s, v))
+            expected = [round(c * 255) for c in colorsys.hsv_to_rgb(hue / 360.0, s, v)]
+            for got, want in zip(_pixel(buffer, size, x, y), expected):
+                self.assertLessEqual(abs(got - want), 8)
+        self.assertEqual(_pixel(buffer, size, 1, 1), (0x10, 0x20, 0x30))
+
+    def test_ring_hue_follows_screen_angle(self) -> None:
+        size = 120
+        background = b"\x00\x00\x00"
+        ring = hue_ring_band(size, 60.0, 40.0, 54.0, background, 0, size)
+        self.assertEqual(len(ring), size * size * 3)
+        self.assertEqual(_pixel(ring, size, 60, 60), (0, 0, 0))
+        r, g, b = _pixel(ring, size, 107, 60)
+        self.assertGreater(r, 200)
+        self.assertLess(g, 40)
+        h, _, _ = colorsys.rgb_to_hsv(*(c / 255 for c in _pixel(ring, size, 60, 107)))
+        self.assertAlmostEqual(h * 360.0, 90.0, delta=3.0)
+
+    def test_slice_stops_before_a_step_that_would_overrun(self) -> None:
+        steps = []
+
+        def job():
+            for index in range(6):
+                time.sleep(0.005)
+                steps.append(index)
+                yield
+
+        scheduled = []
+        wheel = types.SimpleNamespace(FRAME_BUDGET=0.008, _job=job(), _job_after_id=None, _pump_job=None)
+        wheel.after = lambda delay, callback: scheduled.append(delay) or "after"
+        per_slice = []
+        while wheel._job is not None:
+            done = len(steps)
+            HsvWheel._pump_job(wheel)
+            per_slice.append(len(steps) - done)
+        # Two 5 ms steps would overrun the 8 ms budget, so every slice runs exactly one.
+        self.assertEqual(per_slice, [1, 1, 1, 1, 1, 1, 0])
+        self.assertEqual(len(scheduled), 6)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import json
+import tempfile
+import unittest
+import types
+import sys
+from collections import OrderedDict
+from pathlib import Path
+
+if "ttkbootstrap" not in sys.modules:
+    class _FakeStyle:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        def configure(self, *args, **kwargs) -> None:
+            pass
+
+    sys.modules["ttkbootstrap"] = types.SimpleNamespace(Style=_FakeStyle)
+
+from color_picker import ColorPickerApp, Workspace
+
+
+class _FakePanel:
+    def __init__(self) -> None:
+        self.destroyed = False
+
+    def destroy(self) -> None:
+        self.destroyed = True
+
+
+class TestWorkspaces(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.app = types.SimpleNamespace(
+            DEFAULT_WORKSPACE=ColorPickerApp.DEFAULT_WORKSPACE,
+            FAVORITES_FILE=self.root / "favorites.json",
+            WORKSPACES_DIR=self.root / "workspaces",
+            WORKSPACE_CACHE_LIMIT=2,
+        )
+
+    def test_paths_and_discovery(self) -> None:
+        self.assertEqual(ColorPickerApp._workspace_path(self.app, "Default"), self.root / "favorites.json")
+        self.assertEqual(ColorPickerApp._workspace_path(self.app, "Brand"), self.root / "workspaces" / "Brand.json")
+        self.assertEqual(ColorPickerApp._discover_workspaces(self.app), ["Default"])
+        self.app.WORKSPACES_DIR.mkdir()
+        for name in ("zeta", "Alpha", "brand"):
+            (self.app.WORKSPACES_DIR / f"{name}.json").write_text("[]")
+        (self.app.WORKSPACES_DIR / "brand.json.journal").write_text("")
+        self.assertEqual(ColorPickerApp._discover_workspaces(self.app), ["Alpha", "brand", "Default", "zeta"])
+
+    def test_store_round_trip(self) -> None:
+        for name, path in (("Default", self.root / "favorites.json"), ("Brand", self.root / "workspaces" / "Brand.json")):
+            workspace = Workspace(name, path)
+            workspace.favorites = ["#FF0000", "#00FF00"]
+            workspace.history = ["#123456", "#ABCDEF"]
+            workspace.write_store()
+            reopened = Workspace(name, path)
+            reopened.read_store(history_limit=10)
+            self.assertEqual(reopened.favorites, ["#FF0000", "#00FF00"], name)
+            self.assertEqual(reopened.history, ["#123456", "#ABCDEF"], name)
+            reopened.journal.append("add", ["#0000FF"])
+            again = Workspace(name, path)
+            again.read_store(history_limit=1)
+            self.assertEqual(again.favorites, ["#FF0000", "#00FF00", "#0000FF"], name)
+            self.assertEqual(again.history, ["#123456"], name)
+
+    def test_legacy_favorites_list(self) -> None:
+        path = self.root / "favorites.json"
+        path.write_text(json.dumps(["#ff0000", "nope", "#00FF00"]))
+        workspace = Workspace("Default", path)
+        workspace.read_store(history_limit=10)
+        self.assertEqual(workspace.favorites, ["#FF0000", "#00FF00"])
+        self.assertEqual(workspace.history, [])
+
+    def test_lru_unload_saves_history(self) -> None:
+        loaded = OrderedDict()
+        for index, name in enumerate(("B", "Default", "C", "A")):
+            workspace = Workspace(name, ColorPickerApp._workspace_path(self.app, name))
+            workspace.favorites = [f"#FF000{index}"]
+            workspace.history = [f"#00000{index}"]
+            workspace.panel = _FakePanel()
+            loaded[name] = workspace
+        self.app._loaded_workspaces = loaded
+        self.app.workspace = loaded["A"]
+        self.app._save_favorites = Workspace.write_store
+        evicted = [loaded["B"], loaded["Default"]]
+        ColorPickerApp._unload_idle_workspaces(self.app)
+        self.assertEqual(list(loaded), ["C", "A"])
+        self.assertTrue(all(workspace.panel.destroyed for workspace in evicted))
+        for index, name in enumerate(("B", "Default")):
+            reopened = Workspace(name, ColorPickerApp._workspace_path(self.app, name))
+            reopened.read_store(history_limit=10)
+            self.assertEqual(reopened.favorites, [f"#FF000{index}"], name)
+            self.assertEqual(reopened.history, [f"#00000{index}"], name)
+
+if __name__ == "__main__":
+    unittest.main()